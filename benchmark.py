@@ -0,0 +1,43 @@
+import argparse
+import sys
+from simulation import benchmark
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the simulation and detection hot paths")
+    parser.add_argument('--counts', type=int, nargs='+', default=benchmark.DEFAULT_COUNTS, help="object counts to measure")
+    parser.add_argument('--verbosity', type=int, nargs='+', default=benchmark.DEFAULT_VERBOSITY_LEVELS, help="wave verbosity levels")
+    parser.add_argument('--ranges', type=float, nargs='+', default=benchmark.DEFAULT_RADAR_RANGES, help="radar ranges in radians")
+    parser.add_argument('--max-ticks', type=int, default=200, help="maximum measured ticks per case")
+    parser.add_argument('--max-seconds', type=float, default=2.0, help="maximum measuring time per case")
+    parser.add_argument('--repeats', type=int, default=benchmark.DEFAULT_REPEATS, help="measured runs per case, the median is compared")
+    parser.add_argument('--output', metavar='PATH', default=None, help="write the JSON report to a file")
+    parser.add_argument('--baseline', metavar='PATH', default='benchmarks/baseline.json', help="baseline report to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown before flagging a regression")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    results = benchmark.run_suite(tuple(args.counts), tuple(args.verbosity), tuple(args.ranges), args.max_ticks, args.max_seconds,
+     args.repeats)
+    data = benchmark.report(results)
+
+    for result in results:
+        print(f"{result.key:60} {result.ticks_per_second:12.1f} ticks/s  p50 {result.p50_ms:9.3f} ms  "
+              f"p99 {result.p99_ms:9.3f} ms  peak {result.peak_memory_mb:8.2f} MB")
+
+    if args.output:
+        benchmark.save(data, args.output)
+
+    if args.save_baseline:
+        benchmark.save(data, args.baseline)
+        sys.exit(0)
+
+    try:
+        regressions = benchmark.compare(results, benchmark.load(args.baseline), args.tolerance)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        sys.exit(0)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    sys.exit(1 if regressions else 0)
@@ -1,10 +1,71 @@
-import arcade
-from simulation.radar import Radar
-from simulation.config import SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE
+import argparse
+from simulation.recording import Replay
+from simulation.scenario import load_scenario, random_targets
+from simulation.station import RadarStation
+from simulation.sharding import ShardedSimulation
+from simulation.config import SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, TELEMETRY_RATE, NUMBER_OF_SHAPES
 
 
 if __name__ == '__main__':
-    radar = Radar(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
-    radar.setup()
-    arcade.run()
+    parser = argparse.ArgumentParser(description=SCREEN_TITLE)
+    parser.add_argument('--seed', type=int, default=None, help="seed for the generated objects")
+    parser.add_argument('--record', metavar='PATH', default=None, help="record the run into a binary file")
+    parser.add_argument('--replay', metavar='PATH', default=None, help="replay a recorded run")
+    parser.add_argument('--scenario', metavar='PATH', default=None, help="load targets from a .csv, .parquet or .npy scenario")
+    parser.add_argument('--targets', type=int, default=0, help="generate this many random targets, seeded by --seed")
+    parser.add_argument('--profile', metavar='PATH', default=None,
+     help="profile the run and export the frame timings on exit (.csv, .json or a .trace.json Chrome trace)")
+    parser.add_argument('--station', metavar=('X', 'Y'), type=float, nargs=2, action='append', default=[],
+     help="add another radar station at the given position, can be repeated")
+    parser.add_argument('--telemetry', metavar='PORT', type=int, default=None,
+     help="publish the simulation state to dashboards on a local TCP port")
+    parser.add_argument('--telemetry-rate', type=float, default=TELEMETRY_RATE, help="telemetry snapshots per second")
+    parser.add_argument('--time-scale', type=float, default=1.0, help="simulated seconds per real second")
+    parser.add_argument('--fast-forward', metavar='TICKS', type=int, default=0,
+     help="run this many ticks as fast as possible before the window is shown")
+    parser.add_argument('--shards', type=int, default=0,
+     help="move and detect the objects in this many worker processes sharing the simulation memory")
+    args = parser.parse_args()
+    if args.shards and args.replay:
+        parser.error("--replay restores recorded frames and cannot run on shards")
+
+    # arcade and the GUI are only imported once a window is really opened
+    import arcade
+    from simulation.radar import Radar
 
+    scenario = load_scenario(args.scenario) if args.scenario else None
+    core = None
+    if args.shards:
+        # the shared memory is sized once, for the window's own shapes and every loaded target
+        capacity = 2 * NUMBER_OF_SHAPES + (len(scenario) if scenario is not None else 0) + args.targets
+        core = ShardedSimulation(capacity, args.shards, seed=args.seed)
+    radar = Radar(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, seed=args.seed, time_scale=args.time_scale, core=core)
+    for x, y in args.station:
+        radar.add_station(RadarStation(x, y))
+    radar.setup()
+    if scenario is not None:
+        radar.load_targets(scenario)
+    if args.targets:
+        radar.load_targets(random_targets(args.targets, args.seed))
+    if args.record:
+        radar.start_recording(args.record)
+    replay = None
+    try:
+        if args.profile:
+            radar.start_profiling(args.profile)
+        if args.telemetry is not None:
+            radar.start_telemetry(args.telemetry, rate=args.telemetry_rate)
+        if args.replay:
+            replay = Replay(args.replay)
+            radar.start_replay(replay)
+        if args.fast_forward:
+            radar.fast_forward(args.fast_forward)
+        arcade.run()
+    finally:
+        # a session ended by Ctrl-C or an error never reaches on_close, the recording still gets its frame index
+        if radar.recorder is not None:
+            radar.recorder.close()
+        if replay is not None:
+            replay.close()
+        if core is not None:
+            core.close()
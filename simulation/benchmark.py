@@ -0,0 +1,211 @@
+import gc
+import json
+import math
+import platform
+import random
+import time
+import tracemalloc
+import numpy as np
+from dataclasses import dataclass, asdict
+from typing import Callable
+from simulation.core import SimulationCore
+from simulation.detection import sector_mask, stations_swept_mask
+from simulation.shapes import Shape, Ellipse, StableRectangle
+from simulation.station import RadarStation, station_arrays
+from simulation.utils import Point2D, PointHelper
+from simulation.tick import RadarTick
+from simulation.wave import WavePool
+from simulation.config import *
+
+DEFAULT_COUNTS = (20, 1000, 10000, 100000)
+DEFAULT_VERBOSITY_LEVELS = (0, 1)
+DEFAULT_RADAR_RANGES = (0.5, 1.0, 2.0)
+STABLE_SHAPES_RATIO = 0.2
+DEFAULT_STATIONS_NUMBER = 24
+DEFAULT_REPEATS = 3
+
+
+@dataclass
+class BenchmarkResult:
+    name : str
+    count : int
+    wave_verbosity : int
+    radar_range : float
+    ticks : int
+    ticks_per_second : float
+    p50_ms : float
+    p99_ms : float
+    peak_memory_mb : float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/n={self.count}/verbosity={self.wave_verbosity}/range={self.radar_range}"
+
+
+def populate(count : int, seed : int = 0, radar_range : float = RADAR_RANGE) -> SimulationCore:
+    core = SimulationCore(radar_range=radar_range, seed=seed)
+    stable = int(count * STABLE_SHAPES_RATIO)
+    core.add_random_shapes(StableRectangle, stable)
+    core.add_random_shapes(Ellipse, count - stable)
+    return core
+
+
+def plain_shapes(count : int, seed : int = 0) -> 'list[Shape]':
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(count):
+        x, y = Shape.randomize_position(MAP_WIDTH, MAP_HEIGHT, rng)
+        width, height = Shape.randomize_size(rng)
+        d_x, d_y, d_angle = Shape.randomize_movement(OBJECTS_DEFAULT_SPEED, rng)
+        shapes.append(Shape(x, y, width, height, Shape.randomize_angle(rng), d_x, d_y, d_angle, None))
+    return shapes
+
+
+def frame_case(count : int, wave_verbosity : int, radar_range : float, seed : int = 0) -> Callable[[], None]:
+    # the same tick the window runs, only the discovered shapes are kept as positions instead of render instances
+    radar_tick = RadarTick(populate(count, seed, radar_range), WavePool(max(WAVE_POOL_CAPACITY, count)))
+    radar_tick.wave_verbosity_level = wave_verbosity
+    return radar_tick.step
+
+
+def measure(name : str, setup : Callable[[], Callable[[], None]], count : int, wave_verbosity : int = 0,
+ radar_range : float = RADAR_RANGE, max_ticks : int = 200, max_seconds : float = 2.0, warmup : int = 5,
+ repeats : int = DEFAULT_REPEATS) -> BenchmarkResult:
+    tracemalloc.start()
+    tick = setup()
+    for _ in range(warmup):
+        tick()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations = []
+    rates = []
+    for _ in range(repeats):
+        gc.collect()
+        run = []
+        started = time.perf_counter()
+        while len(run) < max_ticks and time.perf_counter() - started < max_seconds / repeats:
+            tick_started = time.perf_counter_ns()
+            tick()
+            run.append(time.perf_counter_ns() - tick_started)
+        durations.extend(run)
+        rates.append(1e9 * len(run) / sum(run))
+
+    # tracing slows the ticks down, so the memory of a measured run is taken on one more run of the same length,
+    # on top of what the setup left allocated
+    tracemalloc.start()
+    for _ in range(len(run)):
+        tick()
+    _, loop_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak = max(peak, retained + loop_peak)
+
+    # the median of the repeated runs is what the regression gate compares, a single slow run does not move it
+    durations_ms = np.array(durations) / 1e6
+    return BenchmarkResult(name, count, wave_verbosity, radar_range, len(durations), float(np.median(rates)),
+     float(np.percentile(durations_ms, 50)), float(np.percentile(durations_ms, 99)), peak / 2 ** 20)
+
+
+def shape_move_case(count : int) -> Callable[[], None]:
+    shapes = plain_shapes(count)
+
+    def tick() -> None:
+        for shape in shapes:
+            shape.move()
+    return tick
+
+
+def point_in_triangle_case(count : int) -> Callable[[], None]:
+    points = [Point2D(shape.x, shape.y) for shape in plain_shapes(count)]
+    core = SimulationCore()
+    x1, y1, x2, y2 = core.sweep_vertices()
+    center, v2, v3 = Point2D(CENTER_X, CENTER_Y), Point2D(x1, y1), Point2D(x2, y2)
+
+    def tick() -> None:
+        for point in points:
+            PointHelper.is_point_in_triangle(point, center, v2, v3)
+    return tick
+
+
+def sector_mask_case(count : int) -> Callable[[], None]:
+    core = populate(count)
+    n = core.count
+
+    def tick() -> None:
+        sector_mask(core.x[:n], core.y[:n], CENTER_X, CENTER_Y, core.angle, core.radar_range, SWEEP_LENGTH, core.wave_radii.max())
+    return tick
+
+
+def stations_mask_case(count : int, stations_number : int = DEFAULT_STATIONS_NUMBER) -> Callable[[], None]:
+    core = populate(count)
+    rng = random.Random(0)
+    for _ in range(stations_number - 1):
+        x, y = Shape.randomize_position(MAP_WIDTH, MAP_HEIGHT, rng)
+        core.add_station(RadarStation(x, y, angle=rng.uniform(0, 2 * math.pi)))
+    n = core.count
+
+    def tick() -> None:
+        stations_swept_mask(core.previous_x[:n], core.previous_y[:n], core.x[:n], core.y[:n], *station_arrays(core.stations))
+    return tick
+
+
+def waves_case(count : int) -> Callable[[], None]:
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(0, MAP_WIDTH, count), rng.uniform(0, MAP_HEIGHT, count)
+    waves = WavePool(count)
+    waves.spawn(x, y, CENTER_X, CENTER_Y, SWEEP_LENGTH)
+
+    # expired waves are respawned, so the pool stays full and every tick exercises the free-list
+    def tick() -> None:
+        waves.update()
+        waves.spawn(x[:waves.free_count], y[:waves.free_count], CENTER_X, CENTER_Y, SWEEP_LENGTH)
+    return tick
+
+
+def run_suite(counts : 'tuple[int, ...]' = DEFAULT_COUNTS, verbosity_levels : 'tuple[int, ...]' = DEFAULT_VERBOSITY_LEVELS,
+ radar_ranges : 'tuple[float, ...]' = DEFAULT_RADAR_RANGES, max_ticks : int = 200, max_seconds : float = 2.0,
+ repeats : int = DEFAULT_REPEATS) -> 'list[BenchmarkResult]':
+    options = dict(max_ticks=max_ticks, max_seconds=max_seconds, repeats=repeats)
+    results = []
+    for count in counts:
+        results.append(measure("shape_move", lambda: shape_move_case(count), count, **options))
+        results.append(measure("point_in_triangle", lambda: point_in_triangle_case(count), count, **options))
+        results.append(measure("sector_mask", lambda: sector_mask_case(count), count, **options))
+        results.append(measure("stations_mask", lambda: stations_mask_case(count), count, **options))
+        results.append(measure("wave_update", lambda: waves_case(count), count, **options))
+        for verbosity in verbosity_levels:
+            for radar_range in radar_ranges:
+                results.append(measure("frame", lambda: frame_case(count, verbosity, radar_range), count,
+                 verbosity, radar_range, **options))
+    return results
+
+
+def report(results : 'list[BenchmarkResult]') -> dict:
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': {result.key: asdict(result) for result in results},
+    }
+
+
+def compare(results : 'list[BenchmarkResult]', baseline : dict, tolerance : float) -> 'list[str]':
+    regressions = []
+    for result in results:
+        reference = baseline['results'].get(result.key)
+        if reference is None:
+            continue
+        if result.ticks_per_second < reference['ticks_per_second'] * (1 - tolerance):
+            regressions.append(f"{result.key}: {result.ticks_per_second:.1f} ticks/s, baseline {reference['ticks_per_second']:.1f} ticks/s")
+        if result.p50_ms > reference['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{result.key}: p50 {result.p50_ms:.3f} ms, baseline {reference['p50_ms']:.3f} ms")
+    return regressions
+
+
+def save(data : dict, path : str) -> None:
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2)
+
+
+def load(path : str) -> dict:
+    with open(path) as file:
+        return json.load(file)
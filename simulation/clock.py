@@ -0,0 +1,64 @@
+import time
+from typing import Callable, Union
+from simulation.config import *
+
+
+class MonotonicClock:
+    def now(self) -> float:
+        return time.monotonic()
+
+
+class ManualClock:
+    def __init__(self, start : float = 0.0) -> None:
+        self.time = start
+
+    def now(self) -> float:
+        return self.time
+
+    def advance(self, seconds : float) -> None:
+        self.time += seconds
+
+
+Clock = Union[MonotonicClock, ManualClock]
+
+
+class FixedTimestepScheduler:
+    def __init__(self, step : Callable[[], None], tick_rate : float = TICKS_PER_SECOND, clock : Clock = None,
+     max_ticks_per_frame : int = MAX_TICKS_PER_FRAME, time_scale : float = 1.0) -> None:
+        self.step = step
+        self.tick_duration = 1.0 / tick_rate
+        self.clock = clock or MonotonicClock()
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.time_scale = time_scale
+        self.accumulator = 0.0
+        self.last_time = None
+        self.ticks = 0
+
+    @property
+    def alpha(self) -> float:
+        return min(self.accumulator / self.tick_duration, 1.0)
+
+    def advance(self) -> int:
+        now = self.clock.now()
+        if self.last_time is None:
+            self.last_time = now
+        self.accumulator += (now - self.last_time) * self.time_scale
+        self.last_time = now
+
+        ticks = 0
+        while self.accumulator >= self.tick_duration and ticks < self.max_ticks_per_frame:
+            self.step()
+            self.accumulator -= self.tick_duration
+            ticks += 1
+
+        # a host that cannot keep up drops the backlog instead of spiralling into ever longer frames
+        if ticks == self.max_ticks_per_frame:
+            self.accumulator = min(self.accumulator, self.tick_duration)
+
+        self.ticks += ticks
+        return ticks
+
+    def run_unthrottled(self, ticks : int) -> None:
+        for _ in range(ticks):
+            self.step()
+        self.ticks += ticks
@@ -1,5 +1,3 @@
-import arcade
-
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 SCREEN_TITLE = "Michal Oracki - Interactive radar"
@@ -11,9 +9,21 @@ RADAR_RANGE = 1.0 # in radians
 DEFAULT_PERCENTAGE_VALUE = 50
 SWEEP_LENGTH = 250
 RADAR_REFRESH_TIME = 2.0
+ANGULAR_BUCKETS = 64
+INDEX_NEAR_RADIUS = 50
+TICKS_PER_SECOND = 60
+MAX_TICKS_PER_FRAME = 10
+EVENTS_BUFFER_SIZE = 4096
+PROFILER_HISTORY = 3600 # frames kept for the export
+PROFILER_OVERLAY_FRAMES = 60
+STATIONS_CHUNK_SIZE = 2 ** 20 # station x shape pairs tested per block
 
-MINIMAP_BACKGROUND_COLOR = arcade.get_four_byte_color(arcade.color.DARK_SLATE_GRAY)
+# plain color tuples, so the simulation modules do not have to import arcade
+MINIMAP_BACKGROUND_COLOR = (47, 79, 79, 255) # DARK_SLATE_GRAY
+DISCOVERED_COLOR = (0, 255, 0) # GREEN
+OBJECT_WAVE_COLOR = (165, 42, 42) # BROWN
 MINIMAP_RATIO = 5
+MINIMAP_REFRESH_TICKS = 2
 MAP_WIDTH = SCREEN_WIDTH
 MAP_HEIGHT = SCREEN_HEIGHT
 
@@ -22,4 +32,21 @@ OBJECTS_DEFAULT_SPEED = 1
 
 INIT_WAVE_RADIUS = SWEEP_LENGTH // 25
 WAVE_DELAY_S = 1
-RADIUS_DELTA = 1
\ No newline at end of file
+RADIUS_DELTA = 1
+RADAR_WAVES_NUMBER = 5
+WAVE_POOL_CAPACITY = 4096
+
+TRACK_GATE = 15 # association gate in pixels
+TRACK_LIFETIME_S = 5.0
+TRACK_CONFIRM_HITS = 3
+TRACK_PROCESS_NOISE = 0.01
+TRACK_MEASUREMENT_NOISE = 1.0
+TRACK_INITIAL_SPEED_VARIANCE = 25.0
+TRACK_MARKER_RADIUS = 4
+
+TELEMETRY_HOST = '127.0.0.1'
+TELEMETRY_PORT = 8765
+TELEMETRY_RATE = 20 # snapshots per second
+TELEMETRY_HISTORY = 64 # snapshots kept to merge the detections of coalesced updates
+TELEMETRY_POSITION_SCALE = 16 # fixed point steps per pixel
+TELEMETRY_WRITE_BUFFER = 2 ** 16 # bytes queued for a client before its updates are coalesced
@@ -0,0 +1,325 @@
+import math
+import random
+import numpy as np
+from typing import Type
+from simulation.shapes import Shape, SHAPE_TYPES
+from simulation.detection import swept_sector_mask, stations_swept_mask
+from simulation.spatial import AngularIndex
+from simulation.tracks import TrackTable
+from simulation.station import RadarStation, station_arrays
+from simulation.events import DetectionEvent, DetectionEventKind, DetectionFeed
+from simulation.profiling import Profiler
+from simulation.config import *
+
+MOVING_BY_KIND = np.array([shape_type.MOVING for shape_type in SHAPE_TYPES])
+
+
+def move_shapes(x : np.ndarray, y : np.ndarray, angle : np.ndarray, delta_x : np.ndarray, delta_y : np.ndarray,
+ delta_angle : np.ndarray, moving : np.ndarray, width : float, height : float) -> None:
+    x += np.where(moving, delta_x, 0)
+    y += np.where(moving, delta_y, 0)
+    angle += np.where(moving, delta_angle, 0)
+
+    bounce_x = ((x < 0) & (delta_x < 0)) | ((x > width) & (delta_x > 0))
+    bounce_y = ((y < 0) & (delta_y < 0)) | ((y > height) & (delta_y > 0))
+    delta_x[bounce_x & moving] *= -1
+    delta_y[bounce_y & moving] *= -1
+
+
+class SimulationCore:
+    INITIAL_CAPACITY = 64
+    DEFAULT_COLOR = (255, 255, 255, 255)
+
+    def __init__(self, width : int = MAP_WIDTH, height : int = MAP_HEIGHT, speed : float = RADIANS_PER_FRAME,
+     radar_range : float = RADAR_RANGE, objects_speed : int = OBJECTS_DEFAULT_SPEED, waves_number : int = RADAR_WAVES_NUMBER,
+     seed : int = None, capacity : int = INITIAL_CAPACITY, refresh_time : float = RADAR_REFRESH_TIME, wave_delay : float = WAVE_DELAY_S) -> None:
+        self.width = width
+        self.height = height
+        self.objects_speed = objects_speed
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.rng = np.random.default_rng(seed)
+        self.stations : 'list[RadarStation]' = [RadarStation(CENTER_X, CENTER_Y, speed, radar_range, SWEEP_LENGTH, waves_number,
+         wave_delay=wave_delay)]
+        self.tick = 0
+
+        self.count = 0
+        self.capacity = 0
+        self.x = self.y = self.previous_x = self.previous_y = self.shape_width = self.shape_height = self.shape_angle = None
+        self.delta_x = self.delta_y = self.delta_angle = self.moving = self.kind = self.ids = self.color = None
+        self.__next_id = 0
+        # rows sorted by shape id, rebuilt lazily after the ids change
+        self.__id_order : np.ndarray = None
+        self.__allocate(capacity)
+        self.index = AngularIndex(self.station.x, self.station.y, self.station.sweep_length)
+        self.max_step = 0.0
+
+        self.detected = np.zeros(0, dtype=np.intp)
+        self.station_detections : 'list[np.ndarray]' = [self.detected]
+        self.tracks = TrackTable(refresh_time * TICKS_PER_SECOND)
+        self.new_contacts : 'list[int]' = []
+        self.lost_contacts : 'list[int]' = []
+        self.feed = DetectionFeed()
+        self.profiler = Profiler()
+
+    @property
+    def station(self) -> RadarStation:
+        return self.stations[0]
+
+    @property
+    def angle(self) -> float:
+        return self.station.angle
+
+    @angle.setter
+    def angle(self, angle : float) -> None:
+        self.station.angle = angle
+
+    @property
+    def previous_angle(self) -> float:
+        return self.station.previous_angle
+
+    @previous_angle.setter
+    def previous_angle(self, angle : float) -> None:
+        self.station.previous_angle = angle
+
+    @property
+    def speed(self) -> float:
+        return self.station.speed
+
+    @speed.setter
+    def speed(self, speed : float) -> None:
+        self.station.speed = speed
+
+    @property
+    def radar_range(self) -> float:
+        return self.station.radar_range
+
+    @radar_range.setter
+    def radar_range(self, radar_range : float) -> None:
+        self.station.radar_range = radar_range
+
+    @property
+    def wave_radii(self) -> np.ndarray:
+        return self.station.wave_radii
+
+    @property
+    def wave_start_ticks(self) -> np.ndarray:
+        return self.station.wave_start_ticks
+
+    def add_station(self, station : RadarStation) -> int:
+        self.stations.append(station)
+        return len(self.stations) - 1
+
+    def __allocate(self, capacity : int) -> None:
+        def grow(array, dtype):
+            new_array = np.zeros(capacity, dtype=dtype)
+            if array is not None:
+                new_array[:self.count] = array[:self.count]
+            return new_array
+
+        self.x = grow(self.x, np.float64)
+        self.y = grow(self.y, np.float64)
+        self.previous_x = grow(self.previous_x, np.float64)
+        self.previous_y = grow(self.previous_y, np.float64)
+        self.shape_width = grow(self.shape_width, np.float64)
+        self.shape_height = grow(self.shape_height, np.float64)
+        self.shape_angle = grow(self.shape_angle, np.float64)
+        self.delta_x = grow(self.delta_x, np.float64)
+        self.delta_y = grow(self.delta_y, np.float64)
+        self.delta_angle = grow(self.delta_angle, np.float64)
+        self.moving = grow(self.moving, np.bool_)
+        self.kind = grow(self.kind, np.int8)
+        self.ids = grow(self.ids, np.int64)
+        self.color = grow(self.color, (np.uint8, 4))
+        self.capacity = capacity
+
+    def add(self, shape_class : Type[Shape], x : float, y : float, width : float, height : float, angle : float,
+     delta_x : float, delta_y : float, delta_angle : float, color : 'tuple[int, ...]' = DEFAULT_COLOR) -> int:
+        if self.count == self.capacity:
+            self.__allocate(2 * self.capacity)
+
+        index = self.count
+        self.x[index] = self.previous_x[index] = x
+        self.y[index] = self.previous_y[index] = y
+        self.shape_width[index] = width
+        self.shape_height[index] = height
+        self.shape_angle[index] = angle
+        self.delta_x[index] = delta_x
+        self.delta_y[index] = delta_y
+        self.delta_angle[index] = delta_angle
+        self.moving[index] = shape_class.MOVING
+        self.kind[index] = SHAPE_TYPES.index(shape_class)
+        self.ids[index] = self.__next_id
+        self.__next_id += 1
+        self.__id_order = None
+        self.color[index] = tuple(color) + (255,) * (4 - len(color))
+        self.index.insert(index, x, y)
+        self.count += 1
+        return index
+
+    def add_targets(self, targets : np.ndarray) -> np.ndarray:
+        number = len(targets)
+        start, end = self.count, self.count + number
+        if end > self.capacity:
+            self.__allocate(max(end, 2 * self.capacity))
+
+        kind = targets['kind']
+        self.x[start:end] = self.previous_x[start:end] = targets['x']
+        self.y[start:end] = self.previous_y[start:end] = targets['y']
+        self.shape_width[start:end] = targets['width']
+        self.shape_height[start:end] = targets['height']
+        self.shape_angle[start:end] = targets['angle']
+        self.delta_x[start:end] = targets['delta_x']
+        self.delta_y[start:end] = targets['delta_y']
+        self.delta_angle[start:end] = targets['delta_angle']
+        self.moving[start:end] = MOVING_BY_KIND[kind]
+        self.kind[start:end] = kind
+        self.ids[start:end] = np.arange(self.__next_id, self.__next_id + number)
+        self.__next_id += number
+        self.__id_order = None
+        self.color[start:end] = targets['color']
+        self.count = end
+        self.index.reserve(end)
+        self.index.update(self.x[:end], self.y[:end])
+        return np.arange(start, end)
+
+    def rows_of(self, ids : np.ndarray) -> np.ndarray:
+        if self.__id_order is None:
+            self.__id_order = np.argsort(self.ids[:self.count], kind='stable')
+        return self.__id_order[np.searchsorted(self.ids[:self.count], ids, sorter=self.__id_order)]
+
+    def add_random_shapes(self, shape_class : Type[Shape], number : int, color : 'tuple[int, ...]' = DEFAULT_COLOR) -> 'list[int]':
+        indices = []
+        for _ in range(number):
+            x, y = Shape.randomize_position(self.width, self.height, self.random)
+            width, height = Shape.randomize_size(self.random)
+            angle = Shape.randomize_angle(self.random)
+            d_x, d_y, d_angle = Shape.randomize_movement(self.objects_speed, self.random)
+            indices.append(self.add(shape_class, x, y, width, height, angle, d_x, d_y, d_angle, color))
+        return indices
+
+    def restore(self, tick : int, angle : float, radar_range : float, ids : np.ndarray, x : np.ndarray, y : np.ndarray,
+     shape_angle : np.ndarray, width : np.ndarray, height : np.ndarray, kind : np.ndarray, color : np.ndarray) -> None:
+        n = len(ids)
+        if n > self.capacity:
+            self.__allocate(max(n, 2 * self.capacity))
+        self.index.reserve(n)
+        if n < self.count:
+            self.index.truncate(n)
+
+        if n == self.count:
+            self.previous_x[:n] = self.x[:n]
+            self.previous_y[:n] = self.y[:n]
+        else:
+            self.previous_x[:n] = x
+            self.previous_y[:n] = y
+        self.previous_angle = self.angle if tick == self.tick + 1 else angle
+
+        if n != self.count or not np.array_equal(self.ids[:n], ids):
+            self.__id_order = None
+        self.count = n
+        self.tick = tick
+        self.angle = angle
+        self.radar_range = radar_range
+        self.ids[:n] = ids
+        self.x[:n] = x
+        self.y[:n] = y
+        self.shape_angle[:n] = shape_angle
+        self.shape_width[:n] = width
+        self.shape_height[:n] = height
+        self.kind[:n] = kind
+        self.color[:n] = color
+        self.moving[:n] = MOVING_BY_KIND[kind]
+        self.index.update(self.x[:n], self.y[:n])
+
+    def randomize_movement(self, objects_speed : int) -> None:
+        # the same ranges as Shape.randomize_movement, drawn for all shapes at once
+        self.objects_speed = objects_speed
+        n = self.count
+        if objects_speed == 0:
+            self.delta_x[:n] = self.delta_y[:n] = self.delta_angle[:n] = 0
+            return
+        self.delta_x[:n] = self.rng.integers(-objects_speed, objects_speed, n)
+        self.delta_y[:n] = self.rng.integers(-objects_speed, objects_speed, n)
+        self.delta_angle[:n] = self.rng.integers(-3, 4, n)
+
+    def interpolated_angle(self, alpha : float = 1.0) -> float:
+        return self.station.interpolated_angle(alpha)
+
+    def interpolated_positions(self, indices : np.ndarray, alpha : float = 1.0) -> 'tuple[np.ndarray, np.ndarray]':
+        if alpha >= 1.0:
+            return self.x[indices], self.y[indices]
+        previous_x, previous_y = self.previous_x[indices], self.previous_y[indices]
+        return previous_x + alpha * (self.x[indices] - previous_x), previous_y + alpha * (self.y[indices] - previous_y)
+
+    def sweep_vertices(self, angle : float = None) -> 'tuple[float, float, float, float]':
+        return self.station.sweep_vertices(angle)
+
+    def step(self) -> None:
+        profiler = self.profiler
+        self.tick += 1
+        with profiler.stage('stations'):
+            for station in self.stations:
+                station.step(self.tick)
+        with profiler.stage('simulate'):
+            self.detected = self.simulate()
+        with profiler.stage('tracks'):
+            self.__update_tracks()
+        profiler.count('detections', len(self.detected))
+
+    def simulate(self) -> np.ndarray:
+        with self.profiler.stage('move'):
+            self.__move()
+        with self.profiler.stage('detect'):
+            return self.__detect()
+
+    def __move(self) -> None:
+        n = self.count
+        self.previous_x[:n] = self.x[:n]
+        self.previous_y[:n] = self.y[:n]
+        move_shapes(self.x[:n], self.y[:n], self.shape_angle[:n], self.delta_x[:n], self.delta_y[:n], self.delta_angle[:n],
+         self.moving[:n], self.width, self.height)
+        # the velocities of moving shapes are their exact steps, a bounce only flips the sign;
+        # shapes that stand still keep their buckets, so only the others are indexed again
+        stepping = np.flatnonzero(self.moving[:n] & ((self.delta_x[:n] != 0) | (self.delta_y[:n] != 0)))
+        self.max_step = math.hypot(np.abs(self.delta_x[stepping]).max(initial=0.0), np.abs(self.delta_y[stepping]).max(initial=0.0))
+        self.index.update(self.x[:n], self.y[:n], self.max_step, stepping)
+
+    def __update_tracks(self) -> None:
+        detected_ids = self.ids[self.detected].tolist()
+        self.new_contacts = [index for index, shape_id in zip(self.detected.tolist(), detected_ids)
+         if self.tracks.discover(shape_id, self.tick)]
+        self.lost_contacts = self.tracks.expire(self.tick)
+        if self.feed.active:
+            self.feed.publish(self.__detection_events())
+
+    def __detection_events(self) -> 'list[DetectionEvent]':
+        new_contacts = set(self.new_contacts)
+        detected = self.detected.tolist()
+        events = [DetectionEvent(DetectionEventKind.NEW_CONTACT if index in new_contacts else DetectionEventKind.REFRESH,
+         shape_id, x, y, self.angle, self.tick) for index, shape_id, x, y
+         in zip(detected, self.ids[detected].tolist(), self.x[detected].tolist(), self.y[detected].tolist())]
+
+        lost = self.rows_of(np.array(self.lost_contacts, dtype=np.int64))
+        events.extend(DetectionEvent(DetectionEventKind.LOST_CONTACT, shape_id, x, y, self.angle, self.tick) for shape_id, x, y
+         in zip(self.lost_contacts, self.x[lost].tolist(), self.y[lost].tolist()))
+        return events
+
+    def __detect(self) -> np.ndarray:
+        n = self.count
+        if len(self.stations) > 1:
+            mask = stations_swept_mask(self.previous_x[:n], self.previous_y[:n], self.x[:n], self.y[:n], *station_arrays(self.stations))
+            self.profiler.count('shapes_tested', mask.size)
+            self.station_detections = [np.flatnonzero(row) for row in mask]
+            return np.flatnonzero(mask.any(axis=0))
+
+        station = self.station
+        # the interval is widened on both sides by the largest bearing change a step could make
+        margin = self.index.bearing_margin(self.max_step)
+        start, width = station.swept_interval()
+        candidates = self.index.query(start - margin, width + 2 * margin)
+        self.profiler.count('shapes_tested', len(candidates))
+        mask = swept_sector_mask(self.previous_x[candidates], self.previous_y[candidates], self.x[candidates], self.y[candidates],
+         station.x, station.y, station.previous_angle, station.speed, station.radar_range, station.sweep_length, station.wave_radii.max())
+        self.station_detections = [candidates[mask]]
+        return self.station_detections[0]
@@ -0,0 +1,78 @@
+import math
+import numpy as np
+from simulation.config import *
+
+
+def sector_mask(x : np.ndarray, y : np.ndarray, center_x : float, center_y : float, angle : float, radar_range : float,
+ sweep_length : float = SWEEP_LENGTH, wave_radius : float = None) -> np.ndarray:
+    # angles follow the sweep convention: 0 points up and grows clockwise (x = sin, y = cos)
+    dx = x - center_x
+    dy = y - center_y
+
+    limit = sweep_length if wave_radius is None else min(sweep_length, wave_radius)
+    in_radius = dx * dx + dy * dy < limit * limit
+
+    if radar_range >= 2 * math.pi:
+        return in_radius
+
+    after_start = math.sin(angle) * dy - math.cos(angle) * dx <= 0
+    before_end = math.sin(angle + radar_range) * dy - math.cos(angle + radar_range) * dx >= 0
+    if radar_range <= math.pi:
+        in_sector = after_start & before_end
+    else:
+        in_sector = after_start | before_end
+
+    return in_radius & in_sector
+
+
+def stations_swept_mask(previous_x : np.ndarray, previous_y : np.ndarray, x : np.ndarray, y : np.ndarray, centers_x : np.ndarray,
+ centers_y : np.ndarray, previous_angles : np.ndarray, sweeps : np.ndarray, radar_ranges : np.ndarray, limits : np.ndarray,
+ chunk_size : int = STATIONS_CHUNK_SIZE) -> np.ndarray:
+    # a target is tested against everything the beam covered since the previous tick, over its whole motion segment,
+    # so neither a fast beam nor a fast target can step over the other
+    stations = len(centers_x)
+    mask = np.zeros((stations, len(x)), dtype=np.bool_)
+    motion_x, motion_y = x - previous_x, y - previous_y
+    length_squared = motion_x * motion_x + motion_y * motion_y
+    length = np.sqrt(length_squared)
+
+    block = max(1, chunk_size // max(stations, 1))
+    for start in range(0, len(x), block):
+        end = start + block
+        start_x = previous_x[None, start:end] - centers_x[:, None]
+        start_y = previous_y[None, start:end] - centers_y[:, None]
+
+        # a segment can only reach the detection circle if its start is within the limit plus its length
+        reach = limits[:, None] + length[None, start:end]
+        station, shape = np.nonzero(start_x * start_x + start_y * start_y < reach * reach)
+        pair_x, pair_y = start_x[station, shape], start_y[station, shape]
+        shape += start
+
+        # closest approach of the motion segment to the station
+        pair_motion_x, pair_motion_y, pair_length_squared = motion_x[shape], motion_y[shape], length_squared[shape]
+        approach = np.divide(-(pair_x * pair_motion_x + pair_y * pair_motion_y), pair_length_squared,
+         out=np.zeros_like(pair_x), where=pair_length_squared > 0).clip(0, 1)
+        closest_x = pair_x + approach * pair_motion_x
+        closest_y = pair_y + approach * pair_motion_y
+        limit = limits[station]
+        in_radius = closest_x * closest_x + closest_y * closest_y < limit * limit
+        station, shape, pair_x, pair_y = station[in_radius], shape[in_radius], pair_x[in_radius], pair_y[in_radius]
+
+        # bearings change monotonically along a segment, so the phase stays between the extremes of both motions
+        start_bearing = np.arctan2(pair_x, pair_y)
+        bearing_change = (np.arctan2(pair_x + motion_x[shape], pair_y + motion_y[shape]) - start_bearing + math.pi) % (2 * math.pi) - math.pi
+        sweep = sweeps[station]
+        low = (start_bearing - previous_angles[station] + np.minimum(bearing_change, 0) - np.maximum(sweep, 0)) % (2 * math.pi)
+        high = low + np.abs(bearing_change) + np.abs(sweep)
+        radar_range = radar_ranges[station]
+        mask[station, shape] = (low <= radar_range) | (high >= 2 * math.pi) | (radar_range >= 2 * math.pi)
+
+    return mask
+
+
+def swept_sector_mask(previous_x : np.ndarray, previous_y : np.ndarray, x : np.ndarray, y : np.ndarray, center_x : float,
+ center_y : float, previous_angle : float, sweep : float, radar_range : float, sweep_length : float = SWEEP_LENGTH,
+ wave_radius : float = None) -> np.ndarray:
+    limit = sweep_length if wave_radius is None else min(sweep_length, wave_radius)
+    return stations_swept_mask(previous_x, previous_y, x, y, np.array([center_x]), np.array([center_y]), np.array([previous_angle]),
+     np.array([sweep]), np.array([radar_range]), np.array([limit]), chunk_size=max(len(x), 1))[0]
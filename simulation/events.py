@@ -0,0 +1,155 @@
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterator
+from simulation.config import *
+
+
+class DetectionEventKind(Enum):
+    NEW_CONTACT = "new_contact"
+    REFRESH = "refresh"
+    LOST_CONTACT = "lost_contact"
+
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+
+
+@dataclass
+class DetectionEvent:
+    kind : DetectionEventKind
+    shape_id : int
+    x : float
+    y : float
+    sweep_angle : float
+    tick : int
+
+
+class EventSubscription:
+    def __init__(self, feed : 'DetectionFeed', maxsize : int = EVENTS_BUFFER_SIZE, overflow : OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> None:
+        self.feed = feed
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self.__buffer : 'deque[DetectionEvent]' = deque()
+        self.__condition = threading.Condition()
+
+    def put(self, events : 'list[DetectionEvent]') -> None:
+        with self.__condition:
+            for event in events:
+                if len(self.__buffer) >= self.maxsize:
+                    if self.overflow == OverflowPolicy.BLOCK:
+                        self.__condition.notify_all()
+                        self.__condition.wait_for(lambda: len(self.__buffer) < self.maxsize or self.closed)
+                        if self.closed:
+                            return
+                    else:
+                        self.__buffer.popleft()
+                        self.dropped += 1
+                self.__buffer.append(event)
+            self.__condition.notify_all()
+
+    def drain(self) -> Iterator[DetectionEvent]:
+        while True:
+            with self.__condition:
+                if not self.__buffer:
+                    return
+                event = self.__buffer.popleft()
+                self.__condition.notify_all()
+            yield event
+
+    def __iter__(self) -> Iterator[DetectionEvent]:
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(lambda: self.__buffer or self.closed)
+                if not self.__buffer:
+                    return
+                event = self.__buffer.popleft()
+                self.__condition.notify_all()
+            yield event
+
+    def close(self) -> None:
+        with self.__condition:
+            self.closed = True
+            self.__condition.notify_all()
+        self.feed.unsubscribe(self)
+
+
+class AsyncEventSubscription:
+    def __init__(self, feed : 'DetectionFeed', maxsize : int = EVENTS_BUFFER_SIZE, overflow : OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+     loop : asyncio.AbstractEventLoop = None) -> None:
+        self.feed = feed
+        self.overflow = overflow
+        self.dropped = 0
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue : 'asyncio.Queue[DetectionEvent]' = asyncio.Queue(maxsize)
+
+    def put(self, events : 'list[DetectionEvent]') -> None:
+        if self.overflow == OverflowPolicy.BLOCK:
+            if self.__in_loop_thread():
+                raise RuntimeError("Blocking subscriptions need the simulation to run outside of the event loop thread")
+            for event in events:
+                asyncio.run_coroutine_threadsafe(self.queue.put(event), self.loop).result()
+        elif self.__in_loop_thread():
+            self.__put_nowait(events)
+        else:
+            self.loop.call_soon_threadsafe(self.__put_nowait, events)
+
+    def __put_nowait(self, events : 'list[DetectionEvent]') -> None:
+        for event in events:
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(event)
+
+    def __in_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    async def get(self) -> DetectionEvent:
+        return await self.queue.get()
+
+    def __aiter__(self) -> 'AsyncEventSubscription':
+        return self
+
+    async def __anext__(self) -> DetectionEvent:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.feed.unsubscribe(self)
+
+
+class DetectionFeed:
+    def __init__(self) -> None:
+        self.subscriptions : 'list[EventSubscription | AsyncEventSubscription]' = []
+
+    @property
+    def active(self) -> bool:
+        return bool(self.subscriptions)
+
+    def subscribe(self, maxsize : int = EVENTS_BUFFER_SIZE, overflow : OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> EventSubscription:
+        subscription = EventSubscription(self, maxsize, overflow)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def subscribe_async(self, maxsize : int = EVENTS_BUFFER_SIZE, overflow : OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+     loop : asyncio.AbstractEventLoop = None) -> AsyncEventSubscription:
+        subscription = AsyncEventSubscription(self, maxsize, overflow, loop)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription : 'EventSubscription | AsyncEventSubscription') -> None:
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def publish(self, events : 'list[DetectionEvent]') -> None:
+        if not events:
+            return
+        for subscription in list(self.subscriptions):
+            subscription.put(events)
@@ -0,0 +1,139 @@
+import csv
+import json
+import math
+import time
+from collections import deque
+from contextlib import nullcontext
+from simulation.config import *
+
+NULL_STAGE = nullcontext()
+
+
+class Stage:
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler : 'Profiler', name : str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.started = 0
+
+    def __enter__(self) -> 'Stage':
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.profiler.record(self.name, self.started, time.perf_counter_ns() - self.started)
+
+
+class FrameProfile:
+    __slots__ = ('number', 'started', 'duration', 'stages', 'counters')
+
+    def __init__(self, number : int, started : int) -> None:
+        self.number = number
+        self.started = started
+        self.duration = 0
+        self.stages : 'list[tuple[str, int, int]]' = []
+        self.counters : 'dict[str, int]' = {}
+
+    def stage_totals(self) -> 'dict[str, int]':
+        totals = {}
+        for name, _, duration in self.stages:
+            totals[name] = totals.get(name, 0) + duration
+        return totals
+
+
+class Profiler:
+    def __init__(self, enabled : bool = False, history : int = PROFILER_HISTORY) -> None:
+        self.enabled = enabled
+        self.frames : 'deque[FrameProfile]' = deque(maxlen=history)
+        self.current : FrameProfile = None
+        self.origin = time.perf_counter_ns()
+        self.__next_frame = 0
+
+    def stage(self, name : str) -> 'Stage | nullcontext':
+        # disabled profiling hands out one shared no-op context, so instrumented code pays a single call
+        if not self.enabled:
+            return NULL_STAGE
+        self.__frame()
+        return Stage(self, name)
+
+    def count(self, name : str, value : int = 1) -> None:
+        if not self.enabled:
+            return
+        counters = self.__frame().counters
+        counters[name] = counters.get(name, 0) + value
+
+    def record(self, name : str, started : int, duration : int) -> None:
+        self.__frame().stages.append((name, started, duration))
+
+    def end_frame(self) -> None:
+        if self.current is None:
+            return
+        self.current.duration = time.perf_counter_ns() - self.current.started
+        self.frames.append(self.current)
+        self.current = None
+
+    def __frame(self) -> FrameProfile:
+        if self.current is None:
+            self.current = FrameProfile(self.__next_frame, time.perf_counter_ns())
+            self.__next_frame += 1
+        return self.current
+
+    def summary(self, frames : int = PROFILER_OVERLAY_FRAMES) -> 'dict[str, float]':
+        recent = list(self.frames)[-frames:]
+        if not recent:
+            return {}
+        # the mean hides hitches, so the slow tail of the frame times is reported next to it
+        durations = sorted(frame.duration for frame in recent)
+        summary = {'frame_ms': sum(durations) / len(durations) / 1e6,
+         'frame_p95_ms': durations[math.ceil(0.95 * len(durations)) - 1] / 1e6, 'frame_max_ms': durations[-1] / 1e6}
+        for frame in recent:
+            for name, duration in frame.stage_totals().items():
+                summary[f"{name}_ms"] = summary.get(f"{name}_ms", 0.0) + duration / len(recent) / 1e6
+            for name, value in frame.counters.items():
+                summary[name] = summary.get(name, 0.0) + value / len(recent)
+        return summary
+
+    def time_series(self) -> 'list[dict]':
+        series = []
+        for frame in self.frames:
+            row = {'frame': frame.number, 'started_ms': (frame.started - self.origin) / 1e6, 'frame_ms': frame.duration / 1e6}
+            row.update({f"{name}_ms": duration / 1e6 for name, duration in frame.stage_totals().items()})
+            row.update(frame.counters)
+            series.append(row)
+        return series
+
+    def export_csv(self, path : str) -> None:
+        series = self.time_series()
+        columns = list(dict.fromkeys(column for row in series for column in row))
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=columns, restval=0)
+            writer.writeheader()
+            writer.writerows(series)
+
+    def export_json(self, path : str) -> None:
+        with open(path, 'w') as file:
+            json.dump(self.time_series(), file)
+
+    def export_chrome_trace(self, path : str) -> None:
+        def microseconds(timestamp : int) -> float:
+            return (timestamp - self.origin) / 1e3
+
+        events = []
+        for frame in self.frames:
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 0, 'tid': 0, 'ts': microseconds(frame.started),
+             'dur': frame.duration / 1e3, 'args': {'frame': frame.number}})
+            events.extend({'name': name, 'ph': 'X', 'pid': 0, 'tid': 0, 'ts': microseconds(started), 'dur': duration / 1e3}
+             for name, started, duration in frame.stages)
+            if frame.counters:
+                events.append({'name': 'counters', 'ph': 'C', 'pid': 0, 'tid': 0, 'ts': microseconds(frame.started), 'args': frame.counters})
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+    def export(self, path : str) -> None:
+        if path.endswith('.csv'):
+            self.export_csv(path)
+        elif path.endswith('.trace.json'):
+            self.export_chrome_trace(path)
+        else:
+            self.export_json(path)
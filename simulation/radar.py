@@ -1,51 +1,51 @@
-from dataclasses import dataclass
 import arcade
-import math
-import datetime
+import numpy as np
 from uuid import uuid4
 from typing import Type
 from simulation.shapes import StableRectangle, Ellipse, Shape
-from simulation.utils import Point2D
 from simulation.config import *
-from simulation.wave import ObjectWave, RadarWave, Wave
+from simulation.core import SimulationCore
+from simulation.station import RadarStation
+from simulation.clock import Clock, FixedTimestepScheduler
+from simulation.recording import Recorder, Replay, ReplayPlayer
+from simulation.tick import RadarTick
+from simulation.telemetry import TelemetryServer
+from simulation.renderer import ShapeRenderer, RingRenderer, INSTANCE_DTYPE, pack_instances, pack_rings
 from simulation.widget_manager import RadarWidgetManager
 
 Numerical = int or float
 
-@dataclass
-class RadarListElement:
-    radar_time_stamp : datetime.datetime
-    shape : Shape
-    id : int
-
-    def is_active(self, current_timestamp : datetime.datetime, seconds_to_refresh : float = RADAR_REFRESH_TIME) -> bool:
-        return current_timestamp - self.radar_time_stamp < datetime.timedelta(seconds=seconds_to_refresh)
-
-
 class Radar(arcade.Window):
     def __init__(self, width : int, height : int, title : str, speed : float = RADIANS_PER_FRAME, minimap_ratio : Numerical = MINIMAP_RATIO,
-     shapes_number : int = NUMBER_OF_SHAPES, objects_speed : int = OBJECTS_DEFAULT_SPEED, radar_range : float = RADAR_RANGE) -> None:
+     shapes_number : int = NUMBER_OF_SHAPES, objects_speed : int = OBJECTS_DEFAULT_SPEED, radar_range : float = RADAR_RANGE,
+     clock : Clock = None, seed : int = None, minimap_interval : int = MINIMAP_REFRESH_TICKS, time_scale : float = 1.0,
+     core : SimulationCore = None) -> None:
         super().__init__(width, height, title)
 
         arcade.set_background_color(arcade.color.BLACK)
 
         self.draw_time = 0
-        self.angle = 0
-        self.speed = speed
-        self.radar_range = radar_range
-        self.radar_discovered_objects : 'list[RadarListElement]' = []
-        self.objects_speed = objects_speed
+        self.core = core or SimulationCore(MAP_WIDTH, MAP_HEIGHT, speed, radar_range, objects_speed, seed=seed)
+        self.recorder : Recorder = None
+        self.telemetry : TelemetryServer = None
+        self.scheduler = FixedTimestepScheduler(self.__tick, TICKS_PER_SECOND, clock, time_scale=time_scale)
+        self.profiler = self.core.profiler
+        self.profile_path : str = None
+        self.profiler_overlay = False
+        self.profiler_text : arcade.Text = None
+        self.radar_tick = RadarTick(self.core, snapshot=lambda core, contacts: pack_instances(core, contacts, DISCOVERED_COLOR))
+        self.radar_discovered_objects = self.radar_tick.radar_discovered_objects
+        self.tracker = self.radar_tick.tracker
+        self.objects_waves = self.radar_tick.objects_waves
         self.shapes_number = shapes_number
-        self.shape_list : 'list[Shape]' = None
+        self.shape_renderer : ShapeRenderer = None
+        self.discovered_renderer : ShapeRenderer = None
+        self.ring_renderer : RingRenderer = None
         self.x1 = CENTER_X
         self.x2 = CENTER_X
         self.y1 = CENTER_Y
-        self.y1 = CENTER_Y
-        self.wave_verbosity_level = 0
+        self.y2 = CENTER_Y
 
-        self.radar_waves : 'list[Wave]' = [RadarWave(CENTER_X, CENTER_Y, maximum_radius=SWEEP_LENGTH, init_radius=INIT_WAVE_RADIUS,
-         initial_delay=datetime.timedelta(seconds=i*WAVE_DELAY_S)) for i in range(5)]
-        self.objects_waves : 'list[Wave]' = []
 
         self.widget_manager = RadarWidgetManager(self)
         
@@ -55,33 +55,94 @@ class Radar(arcade.Window):
         self.minimap_sprite_list = None
         self.minimap_texture = None
         self.minimap_sprite = None
+        self.minimap_interval = minimap_interval
+        self.minimap_dirty = True
+        self.minimap_rendered_tick : int = None
+
+    @property
+    def angle(self) -> float:
+        return self.core.angle
+
+    @property
+    def speed(self) -> float:
+        return self.core.speed
+
+    @speed.setter
+    def speed(self, speed : float) -> None:
+        self.core.speed = speed
+
+    @property
+    def radar_range(self) -> float:
+        return self.core.radar_range
+
+    @radar_range.setter
+    def radar_range(self, radar_range : float) -> None:
+        self.core.radar_range = radar_range
+
+    @property
+    def objects_speed(self) -> int:
+        return self.core.objects_speed
+
+    @property
+    def wave_verbosity_level(self) -> int:
+        return self.radar_tick.wave_verbosity_level
+
+    @wave_verbosity_level.setter
+    def wave_verbosity_level(self, wave_verbosity_level : int) -> None:
+        self.radar_tick.wave_verbosity_level = wave_verbosity_level
+
+    @property
+    def replay_player(self) -> ReplayPlayer:
+        return self.radar_tick.replay_player
 
     def setup(self) -> None:
         self.__setup_base()
         self.__setup_minimap()
 
     def setup_shapes(self, shape_class : Type[Shape], color : arcade.Color) -> None:
-        for _ in range(self.shapes_number):
-            x, y = Shape.randomize_position(self.width, self.height)
-            width, height = Shape.randomize_size()
-            angle = Shape.randomize_angle()
-            d_x, d_y, d_angle = Shape.randomize_movement(self.objects_speed)
+        self.core.add_random_shapes(shape_class, self.shapes_number, color)
+        self.minimap_dirty = True
+
+    def load_targets(self, targets : np.ndarray) -> None:
+        self.core.add_targets(targets)
+        self.minimap_dirty = True
+
+    def start_recording(self, path : str) -> None:
+        self.recorder = Recorder(path, self.core)
+
+    def start_telemetry(self, port : int = TELEMETRY_PORT, host : str = TELEMETRY_HOST, rate : float = TELEMETRY_RATE) -> None:
+        self.telemetry = TelemetryServer(self.core, host, port, rate)
+        self.telemetry.start()
+
+    def add_station(self, station : RadarStation) -> None:
+        self.core.add_station(station)
+        self.minimap_dirty = True
 
-            shape = shape_class(x, y, width, height, angle, d_x, d_y,
-                                  d_angle, color)
-            
-            self.shape_list.append(shape)
+    def start_profiling(self, path : str = None) -> None:
+        self.profile_path = path
+        self.profiler.enabled = True
+
+    def toggle_profiler_overlay(self) -> None:
+        self.profiler_overlay = not self.profiler_overlay
+        self.profiler.enabled = self.profiler_overlay or self.profile_path is not None
+
+    def start_replay(self, replay : Replay) -> None:
+        self.radar_tick.replay_player = ReplayPlayer(replay, self.core)
+
+    def fast_forward(self, ticks : int) -> None:
+        # the ticks run back to back before the window shows anything, recording and telemetry included
+        self.scheduler.run_unthrottled(ticks)
 
     def update_speed(self, speed : float) -> None:
         self.speed = speed
 
     def update_objects_speed_range(self, objects_speed) -> None:
-        self.objects_speed = objects_speed
-        for shape in self.shape_list:
-            shape.delta_x, shape.delta_y, shape.delta_angle = Shape.randomize_movement(self.objects_speed)
+        self.core.randomize_movement(objects_speed)
 
     def __setup_base(self) -> None:
-        self.shape_list = []
+        self.shape_renderer = ShapeRenderer(self.ctx)
+        self.discovered_renderer = ShapeRenderer(self.ctx)
+        self.ring_renderer = RingRenderer(self.ctx)
         self.setup_shapes(StableRectangle, arcade.color.AERO_BLUE)
         self.setup_shapes(Ellipse, arcade.color.RED)
         self.widget_manager.setup()
@@ -97,82 +158,107 @@ class Radar(arcade.Window):
         self.minimap_sprite_list.append(self.minimap_sprite)
 
     def __update_minimap(self) -> None:
+        # the minimap only changes with the simulation, so it is redrawn on ticks and at most every minimap_interval ticks
+        if not self.minimap_dirty:
+            return
+        if self.minimap_rendered_tick is not None and self.core.tick - self.minimap_rendered_tick < self.minimap_interval:
+            return
+
         proj = 0, MAP_WIDTH, 0, MAP_HEIGHT
         with self.minimap_sprite_list.atlas.render_into(self.minimap_texture, projection=proj) as fbo:
             fbo.clear(MINIMAP_BACKGROUND_COLOR)
-            self.__update_radar(minimap=True)
+            self.__draw_stations()
             self.__draw_shapes_minimap()
-
-    def __update_angle(self) -> None:
-        self.angle += self.speed
-        if self.angle > 2 * math.pi:
-            self.angle = 0.0
+        self.profiler.count('draw_calls', len(self.core.stations) + 1)
+        self.minimap_dirty = False
+        self.minimap_rendered_tick = self.core.tick
 
     def __draw_shapes_minimap(self) -> None:
-        for shape in self.shape_list:
-            shape.draw()
+        self.shape_renderer.update(pack_instances(self.core))
+        self.shape_renderer.draw()
 
     def __draw_shapes(self) -> None:
-        for element in self.radar_discovered_objects:
-            element.shape.draw()
-
-        for wave in self.radar_waves:
-            wave.draw_wave()
-            wave.update_radius()
-
-        new_objects_waves = [wave for wave in self.objects_waves if wave.active]
-        self.objects_waves = new_objects_waves
-
-        for wave in self.objects_waves:
-            wave.draw_wave()
-            wave.update_radius()
-
-    def __is_shape_detectable(self, shape : Shape) -> bool:
-        return shape.is_in_range(Point2D(CENTER_X, CENTER_Y), Point2D(self.x1, self.y1), Point2D(self.x2, self.y2)) and self.__is_shape_in_any_wave(shape)
-
-    def __update_discoveries(self) -> None:
-        for shape in self.shape_list:
-            if self.__is_shape_detectable(shape):
-                new_shape = shape.from_shape(shape)
-                if id(shape) not in (elem.id for elem in self.radar_discovered_objects):
-                    self.radar_discovered_objects.append(RadarListElement(datetime.datetime.now(), new_shape, id(shape)))
-                    if self.wave_verbosity_level == 1:
-                        self.objects_waves.append(ObjectWave(shape.x, shape.y))
-        
-        updated_discoveries = [elem for elem in self.radar_discovered_objects if elem.is_active(datetime.datetime.now())]
-        self.radar_discovered_objects = updated_discoveries
-
-    def __is_shape_in_any_wave(self, shape : Shape) -> bool:
-        for wave in self.radar_waves:
-            if wave.is_shape_in_wave(shape):
-                return True
-        return False
-    
-    def __update_radar(self, minimap : bool = False) -> None:
-        self.x1 = SWEEP_LENGTH * math.sin(self.angle) + CENTER_X
-        self.y1 = SWEEP_LENGTH * math.cos(self.angle) + CENTER_Y
-        self.x2 = SWEEP_LENGTH * math.sin(self.angle + self.radar_range) + CENTER_X
-        self.y2 = SWEEP_LENGTH * math.cos(self.angle + self.radar_range) + CENTER_Y
-        
-        arcade.draw_circle_outline(CENTER_X, CENTER_Y, SWEEP_LENGTH + 1,
-							arcade.color.DARK_GREEN, 10)
-        if not minimap:
-            arcade.draw_line(CENTER_X, CENTER_Y, self.x1, self.y1, arcade.color.OLIVE, 4)
-            arcade.draw_line(CENTER_X, CENTER_Y, self.x2, self.y2, arcade.color.OLIVE, 4)
+        discovered = [element.shapes for element in self.radar_discovered_objects]
+        self.discovered_renderer.update(np.concatenate(discovered) if discovered else np.zeros(0, dtype=INSTANCE_DTYPE))
+        self.discovered_renderer.draw()
+
+        rings = [pack_rings(*self.objects_waves.circles(), OBJECT_WAVE_COLOR)]
+        confirmed = self.tracker.confirmed
+        track_x, track_y = self.tracker.predicted_positions(self.core.tick + self.scheduler.alpha)
+        rings.append(pack_rings(track_x[confirmed], track_y[confirmed], np.full(confirmed.sum(), TRACK_MARKER_RADIUS), arcade.color.YELLOW))
+        for station in self.core.stations:
+            radii = station.started_waves(self.core.tick)
+            rings.append(pack_rings(np.full(len(radii), station.x), np.full(len(radii), station.y), radii, arcade.color.GREEN))
+        self.ring_renderer.update(np.concatenate(rings))
+        self.ring_renderer.draw()
+        self.profiler.count('draw_calls', 2)
+
+    def __draw_stations(self) -> None:
+        for station in self.core.stations:
+            arcade.draw_circle_outline(station.x, station.y, station.sweep_length + 1,
+                                arcade.color.DARK_GREEN, 10)
+
+    def __update_radar(self) -> None:
+        self.x1, self.y1, self.x2, self.y2 = self.core.sweep_vertices(self.core.interpolated_angle(self.scheduler.alpha))
+
+        self.__draw_stations()
+        for station in self.core.stations:
+            x1, y1, x2, y2 = station.sweep_vertices(station.interpolated_angle(self.scheduler.alpha))
+            arcade.draw_line(station.x, station.y, x1, y1, arcade.color.OLIVE, 4)
+            arcade.draw_line(station.x, station.y, x2, y2, arcade.color.OLIVE, 4)
+        self.profiler.count('draw_calls', 3 * len(self.core.stations))
+
+    def __draw_profiler(self) -> None:
+        summary = self.profiler.summary()
+        lines = [f"{name}: {value:.2f}" if name.endswith('_ms') else f"{name}: {value:.0f}" for name, value in summary.items()]
+        if self.profiler_text is None:
+            self.profiler_text = arcade.Text("", 10, 10, arcade.color.WHITE, 9, width=260, multiline=True, anchor_y='bottom')
+        self.profiler_text.text = "\n".join(lines)
+        self.profiler_text.draw()
+        self.profiler.count('draw_calls')
+
+    def __tick(self) -> None:
+        profiler = self.profiler
+        with profiler.stage('tick'):
+            self.radar_tick.step()
+            if self.recorder is not None:
+                with profiler.stage('record'):
+                    self.recorder.record()
+            if self.telemetry is not None:
+                with profiler.stage('telemetry'):
+                    self.telemetry.publish()
+        self.minimap_dirty = True
 
     def on_update(self, _) -> None:
-        for shape in self.shape_list:
-            shape.move()
+        self.scheduler.advance()
 
-    def on_draw(self) -> None:
-        self.__update_angle()
+    def on_close(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+        if self.profile_path is not None:
+            self.profiler.export(self.profile_path)
+        super().on_close()
 
+    def on_draw(self) -> None:
+        profiler = self.profiler
         arcade.start_render()
-        self.__update_radar()
-        self.widget_manager.draw()
-        
-        self.__update_minimap()
-        self.__update_discoveries()
-        self.__draw_shapes()
+        with profiler.stage('update_radar'):
+            self.__update_radar()
+        with profiler.stage('widgets'):
+            self.widget_manager.draw()
+            profiler.count('draw_calls')
+
+        with profiler.stage('minimap'):
+            self.__update_minimap()
+        with profiler.stage('draw_shapes'):
+            self.__draw_shapes()
+
+        with profiler.stage('minimap_sprite'):
+            self.minimap_sprite_list.draw()
+            profiler.count('draw_calls')
 
-        self.minimap_sprite_list.draw()
+        if self.profiler_overlay:
+            self.__draw_profiler()
+        profiler.end_frame()
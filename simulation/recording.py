@@ -0,0 +1,234 @@
+import json
+import mmap
+import struct
+import numpy as np
+from simulation.core import SimulationCore
+from simulation.events import DetectionEventKind, EventSubscription
+from simulation.config import *
+
+MAGIC = b"RADARREC"
+VERSION = 1
+HEADER_FORMAT = "<8sII"
+TRAILER_FORMAT = "<qq8s"
+
+TICK_DTYPE = np.dtype([
+    ('tick', '<i8'),
+    ('angle', '<f8'),
+    ('radar_range', '<f8'),
+    ('shapes', '<u4'),
+    ('events', '<u4'),
+])
+
+SHAPE_DTYPE = np.dtype([
+    ('id', '<i8'),
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('angle', '<f4'),
+    ('width', '<f4'),
+    ('height', '<f4'),
+    ('kind', 'i1'),
+    ('color', 'u1', 4),
+])
+
+EVENT_DTYPE = np.dtype([
+    ('kind', 'u1'),
+    ('shape_id', '<i8'),
+    ('x', '<f4'),
+    ('y', '<f4'),
+])
+
+INDEX_DTYPE = np.dtype([
+    ('offset', '<i8'),
+    ('tick', '<i8'),
+])
+
+EVENT_KINDS = list(DetectionEventKind)
+
+
+class Recorder:
+    def __init__(self, path : str, core : SimulationCore, metadata : dict = None) -> None:
+        self.core = core
+        self.file = open(path, 'wb')
+        self.index : 'list[tuple[int, int]]' = []
+        self.subscription : EventSubscription = core.feed.subscribe(maxsize=2 ** 31)
+
+        header = {
+            'seed': core.seed,
+            'ticks_per_second': TICKS_PER_SECOND,
+            'map_width': core.width,
+            'map_height': core.height,
+            'sweep_length': SWEEP_LENGTH,
+            'tick_dtype': TICK_DTYPE.descr,
+            'shape_dtype': SHAPE_DTYPE.descr,
+            'event_dtype': EVENT_DTYPE.descr,
+            **(metadata or {}),
+        }
+        payload = json.dumps(header).encode()
+        self.file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(payload)))
+        self.file.write(payload)
+
+    def __enter__(self) -> 'Recorder':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def record(self) -> None:
+        core = self.core
+        n = core.count
+        events = list(self.subscription.drain())
+
+        tick = np.zeros(1, dtype=TICK_DTYPE)
+        tick['tick'] = core.tick
+        tick['angle'] = core.angle
+        tick['radar_range'] = core.radar_range
+        tick['shapes'] = n
+        tick['events'] = len(events)
+
+        shapes = np.empty(n, dtype=SHAPE_DTYPE)
+        shapes['id'] = core.ids[:n]
+        shapes['x'] = core.x[:n]
+        shapes['y'] = core.y[:n]
+        shapes['angle'] = core.shape_angle[:n]
+        shapes['width'] = core.shape_width[:n]
+        shapes['height'] = core.shape_height[:n]
+        shapes['kind'] = core.kind[:n]
+        shapes['color'] = core.color[:n]
+
+        event_records = np.empty(len(events), dtype=EVENT_DTYPE)
+        event_records['kind'] = [EVENT_KINDS.index(event.kind) for event in events]
+        event_records['shape_id'] = [event.shape_id for event in events]
+        event_records['x'] = [event.x for event in events]
+        event_records['y'] = [event.y for event in events]
+
+        self.index.append((self.file.tell(), core.tick))
+        self.file.write(tick.tobytes())
+        self.file.write(shapes.tobytes())
+        self.file.write(event_records.tobytes())
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.subscription.close()
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.index, dtype=INDEX_DTYPE).tobytes())
+        self.file.write(struct.pack(TRAILER_FORMAT, index_offset, len(self.index), MAGIC))
+        self.file.close()
+
+
+class ReplayFrame:
+    def __init__(self, tick : np.void, shapes : np.ndarray, events : np.ndarray) -> None:
+        self.tick = int(tick['tick'])
+        self.angle = float(tick['angle'])
+        self.radar_range = float(tick['radar_range'])
+        self.shapes = shapes
+        self.events = events
+
+    def event_ids(self, *kinds : DetectionEventKind) -> np.ndarray:
+        codes = [EVENT_KINDS.index(kind) for kind in kinds]
+        return self.events['shape_id'][np.isin(self.events['kind'], codes)]
+
+
+class Replay:
+    def __init__(self, path : str) -> None:
+        self.file = open(path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_length = struct.unpack_from(HEADER_FORMAT, self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a radar recording (version {VERSION})")
+        self.header = json.loads(self.buffer[struct.calcsize(HEADER_FORMAT):struct.calcsize(HEADER_FORMAT) + header_length])
+        self.seed = self.header['seed']
+
+        frames_offset = struct.calcsize(HEADER_FORMAT) + header_length
+        trailer_size = struct.calcsize(TRAILER_FORMAT)
+        magic = None
+        if len(self.buffer) - frames_offset >= trailer_size:
+            index_offset, frames, magic = struct.unpack_from(TRAILER_FORMAT, self.buffer, len(self.buffer) - trailer_size)
+        if magic == MAGIC:
+            self.index = np.frombuffer(self.buffer, dtype=INDEX_DTYPE, count=frames, offset=index_offset)
+        else:
+            # the recorder was never closed, the index is rebuilt from the tick headers
+            self.index = self.__scan_frames(frames_offset)
+
+    def __enter__(self) -> 'Replay':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __scan_frames(self, offset : int) -> np.ndarray:
+        index = []
+        end = len(self.buffer)
+        while offset + TICK_DTYPE.itemsize <= end:
+            tick = np.frombuffer(self.buffer, dtype=TICK_DTYPE, count=1, offset=offset)[0]
+            size = TICK_DTYPE.itemsize + int(tick['shapes']) * SHAPE_DTYPE.itemsize + int(tick['events']) * EVENT_DTYPE.itemsize
+            if offset + size > end:
+                # the last frame was cut short when the session ended
+                break
+            index.append((offset, int(tick['tick'])))
+            offset += size
+        return np.array(index, dtype=INDEX_DTYPE)
+
+    def frame(self, position : int) -> ReplayFrame:
+        # the shapes and events are views into the mapped file, copy them to keep them past close()
+        offset = int(self.index['offset'][position])
+        tick = np.frombuffer(self.buffer, dtype=TICK_DTYPE, count=1, offset=offset)[0]
+        offset += TICK_DTYPE.itemsize
+        shapes = np.frombuffer(self.buffer, dtype=SHAPE_DTYPE, count=int(tick['shapes']), offset=offset)
+        offset += shapes.nbytes
+        events = np.frombuffer(self.buffer, dtype=EVENT_DTYPE, count=int(tick['events']), offset=offset)
+        return ReplayFrame(tick, shapes, events)
+
+    def position_of(self, tick : int) -> int:
+        if not len(self.index):
+            return 0
+        return min(int(np.searchsorted(self.index['tick'], tick)), len(self.index) - 1)
+
+    def close(self) -> None:
+        self.index = None
+        try:
+            self.buffer.close()
+        except BufferError:
+            # frames still hold views into the mapping, it is released together with the last of them
+            pass
+        self.file.close()
+
+
+class ReplayPlayer:
+    def __init__(self, replay : Replay, core : SimulationCore) -> None:
+        self.replay = replay
+        self.core = core
+        self.position = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.replay)
+
+    def seek(self, tick : int) -> None:
+        self.position = self.replay.position_of(tick)
+
+    def step(self) -> None:
+        if self.finished:
+            # the last frame stays on screen, but the clock keeps running without detections, so discoveries fade out
+            self.core.tick += 1
+            self.core.detected = np.zeros(0, dtype=np.intp)
+            self.core.station_detections = [self.core.detected]
+            self.core.new_contacts = []
+            self.core.lost_contacts = []
+            return
+
+        frame = self.replay.frame(self.position)
+        shapes = frame.shapes
+        self.core.restore(frame.tick, frame.angle, frame.radar_range, shapes['id'], shapes['x'], shapes['y'],
+         shapes['angle'], shapes['width'], shapes['height'], shapes['kind'], shapes['color'])
+
+        self.core.detected = self.core.rows_of(frame.event_ids(DetectionEventKind.NEW_CONTACT, DetectionEventKind.REFRESH))
+        # a recording does not keep which station detected a contact, they are all given to the main station
+        self.core.station_detections = [self.core.detected]
+        self.core.new_contacts = self.core.rows_of(frame.event_ids(DetectionEventKind.NEW_CONTACT)).tolist()
+        self.core.lost_contacts = frame.event_ids(DetectionEventKind.LOST_CONTACT).tolist()
+        self.position += 1
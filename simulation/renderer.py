@@ -0,0 +1,196 @@
+import arcade
+import numpy as np
+from arcade.gl import BufferDescription
+from simulation.core import SimulationCore
+from simulation.shapes import SHAPE_TYPES, Ellipse, Line
+
+INSTANCE_DTYPE = np.dtype([
+    ('position', np.float32, 2),
+    ('size', np.float32, 2),
+    ('angle', np.float32),
+    ('color', np.uint8, 4),
+    ('ellipse', np.float32),
+])
+
+VERTEX_SHADER = """
+#version 330
+
+uniform Projection {
+    uniform mat4 matrix;
+} proj;
+
+in vec2 in_vert;
+in vec2 in_position;
+in vec2 in_size;
+in float in_angle;
+in vec4 in_color;
+in float in_ellipse;
+
+out vec2 v_local;
+out vec4 v_color;
+out float v_ellipse;
+
+void main() {
+    float angle = radians(in_angle);
+    mat2 rotation = mat2(cos(angle), sin(angle), -sin(angle), cos(angle));
+    gl_Position = proj.matrix * vec4(in_position + rotation * (in_vert * in_size), 0.0, 1.0);
+    v_local = in_vert * 2.0;
+    v_color = in_color;
+    v_ellipse = in_ellipse;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+
+in vec2 v_local;
+in vec4 v_color;
+in float v_ellipse;
+
+out vec4 f_color;
+
+void main() {
+    if (v_ellipse > 0.5 && dot(v_local, v_local) > 1.0)
+        discard;
+    f_color = v_color;
+}
+"""
+
+RING_DTYPE = np.dtype([
+    ('position', np.float32, 2),
+    ('radius', np.float32),
+    ('color', np.uint8, 4),
+])
+
+RING_VERTEX_SHADER = """
+#version 330
+
+uniform Projection {
+    uniform mat4 matrix;
+} proj;
+
+in vec2 in_vert;
+in vec2 in_position;
+in float in_radius;
+in vec4 in_color;
+
+out vec4 v_color;
+
+void main() {
+    gl_Position = proj.matrix * vec4(in_position + in_vert * in_radius, 0.0, 1.0);
+    v_color = in_color;
+}
+"""
+
+RING_FRAGMENT_SHADER = """
+#version 330
+
+in vec4 v_color;
+
+out vec4 f_color;
+
+void main() {
+    f_color = v_color;
+}
+"""
+
+LINE_WIDTH = 2
+RING_SEGMENTS = 64
+
+
+def pack_instances(core : SimulationCore, indices : np.ndarray = None, color : arcade.Color = None, alpha : float = 1.0) -> np.ndarray:
+    if indices is None:
+        indices = np.arange(core.count)
+
+    kind = core.kind[indices]
+    width = core.shape_width[indices]
+    height = core.shape_height[indices]
+    x, y = core.interpolated_positions(indices, alpha)
+    angle = core.shape_angle[indices]
+
+    # lines are drawn from the shape position to (x + width, y + height), as thin rotated rectangles
+    lines = kind == SHAPE_TYPES.index(Line)
+    if lines.any():
+        x = np.where(lines, x + width / 2, x)
+        y = np.where(lines, y + height / 2, y)
+        angle = np.where(lines, np.degrees(np.arctan2(height, width)), angle)
+        width, height = np.where(lines, np.hypot(width, height), width), np.where(lines, LINE_WIDTH, height)
+
+    instances = np.empty(len(indices), dtype=INSTANCE_DTYPE)
+    instances['position'][:, 0] = x
+    instances['position'][:, 1] = y
+    instances['size'][:, 0] = width
+    instances['size'][:, 1] = height
+    instances['angle'] = angle
+    instances['color'] = core.color[indices] if color is None else arcade.get_four_byte_color(color)
+    instances['ellipse'] = kind == SHAPE_TYPES.index(Ellipse)
+    return instances
+
+
+def pack_rings(x : np.ndarray, y : np.ndarray, radius : np.ndarray, color : arcade.Color) -> np.ndarray:
+    rings = np.empty(len(x), dtype=RING_DTYPE)
+    rings['position'][:, 0] = x
+    rings['position'][:, 1] = y
+    rings['radius'] = radius
+    rings['color'] = arcade.get_four_byte_color(color)
+    return rings
+
+
+class InstancedRenderer:
+    INITIAL_CAPACITY = 256
+    DTYPE = INSTANCE_DTYPE
+
+    def __init__(self, ctx : arcade.ArcadeContext) -> None:
+        self.ctx = ctx
+        self.capacity = self.INITIAL_CAPACITY
+        self.instance_buffer = ctx.buffer(reserve=self.capacity * self.DTYPE.itemsize, usage="stream")
+        self.instances_number = 0
+
+    def update(self, instances : np.ndarray) -> None:
+        if len(instances) > self.capacity:
+            while self.capacity < len(instances):
+                self.capacity *= 2
+            self.instance_buffer.orphan(size=self.capacity * self.DTYPE.itemsize)
+
+        if len(instances):
+            self.instance_buffer.write(np.ascontiguousarray(instances, dtype=self.DTYPE))
+        self.instances_number = len(instances)
+
+
+class ShapeRenderer(InstancedRenderer):
+    def __init__(self, ctx : arcade.ArcadeContext) -> None:
+        super().__init__(ctx)
+        self.program = ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
+        quad = np.array([-0.5, -0.5, 0.5, -0.5, -0.5, 0.5, 0.5, 0.5], dtype=np.float32)
+        self.quad_buffer = ctx.buffer(data=quad)
+        self.geometry = ctx.geometry([
+            BufferDescription(self.quad_buffer, '2f', ['in_vert']),
+            BufferDescription(self.instance_buffer, '2f 2f 1f 4f1 1f',
+             ['in_position', 'in_size', 'in_angle', 'in_color', 'in_ellipse'], normalized=['in_color'], instanced=True),
+        ], mode=ctx.TRIANGLE_STRIP)
+
+    def draw(self) -> None:
+        if self.instances_number:
+            self.ctx.enable(self.ctx.BLEND)
+            self.geometry.render(self.program, vertices=4, instances=self.instances_number)
+
+
+class RingRenderer(InstancedRenderer):
+    DTYPE = RING_DTYPE
+
+    def __init__(self, ctx : arcade.ArcadeContext) -> None:
+        super().__init__(ctx)
+        self.program = ctx.program(vertex_shader=RING_VERTEX_SHADER, fragment_shader=RING_FRAGMENT_SHADER)
+        angles = np.linspace(0, 2 * np.pi, RING_SEGMENTS, endpoint=False)
+        circle = np.column_stack([np.cos(angles), np.sin(angles)]).astype(np.float32)
+        self.circle_buffer = ctx.buffer(data=circle)
+        self.geometry = ctx.geometry([
+            BufferDescription(self.circle_buffer, '2f', ['in_vert']),
+            BufferDescription(self.instance_buffer, '2f 1f 4f1', ['in_position', 'in_radius', 'in_color'],
+             normalized=['in_color'], instanced=True),
+        ], mode=ctx.LINE_LOOP)
+
+    def draw(self) -> None:
+        if self.instances_number:
+            self.ctx.enable(self.ctx.BLEND)
+            self.geometry.render(self.program, vertices=RING_SEGMENTS, instances=self.instances_number)
@@ -0,0 +1,161 @@
+import warnings
+import numpy as np
+from typing import Type
+from simulation.shapes import Shape, Ellipse, SHAPE_TYPES
+from simulation.config import *
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+SCENARIO_DTYPE = np.dtype([
+    ('kind', 'i1'),
+    ('x', '<f8'),
+    ('y', '<f8'),
+    ('width', '<f8'),
+    ('height', '<f8'),
+    ('angle', '<f8'),
+    ('delta_x', '<f8'),
+    ('delta_y', '<f8'),
+    ('delta_angle', '<f8'),
+    ('color', 'u1', 4),
+])
+
+REQUIRED_COLUMNS = ('kind', 'x', 'y', 'width', 'height')
+MOTION_COLUMNS = ('angle', 'delta_x', 'delta_y', 'delta_angle')
+COLOR_COLUMNS = ('r', 'g', 'b', 'a')
+DEFAULT_COLOR = (255, 255, 255, 255)
+KIND_NAMES = [shape_type.__name__ for shape_type in SHAPE_TYPES]
+
+
+def kind_codes(kinds : np.ndarray) -> np.ndarray:
+    if kinds.dtype.kind in 'iu':
+        codes = kinds
+    else:
+        # kinds are given by class name or by code, each distinct value is resolved once
+        names, inverse = np.unique(kinds.astype(str), return_inverse=True)
+        resolved = []
+        for name in names.tolist():
+            if name in KIND_NAMES:
+                resolved.append(KIND_NAMES.index(name))
+            elif name.lstrip('-').isdigit():
+                resolved.append(int(name))
+            else:
+                raise ValueError(f"Unknown target kind {name!r}, expected one of {', '.join(KIND_NAMES)}")
+        codes = np.array(resolved, dtype=np.int64)[inverse]
+
+    if len(codes) and (codes.min() < 0 or codes.max() >= len(SHAPE_TYPES)):
+        raise ValueError(f"Target kind codes must be between 0 and {len(SHAPE_TYPES) - 1}")
+    return codes
+
+
+def targets_from_columns(columns : 'dict[str, np.ndarray]') -> np.ndarray:
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Scenario is missing the {', '.join(missing)} column(s)")
+
+    targets = np.zeros(len(columns['x']), dtype=SCENARIO_DTYPE)
+    targets['kind'] = kind_codes(np.asarray(columns['kind']))
+    for column in REQUIRED_COLUMNS[1:] + MOTION_COLUMNS:
+        if column in columns:
+            targets[column] = columns[column]
+
+    if 'color' in columns:
+        targets['color'] = columns['color']
+    else:
+        for channel, column in enumerate(COLOR_COLUMNS):
+            targets['color'][:, channel] = columns.get(column, DEFAULT_COLOR[channel])
+    return targets
+
+
+def load_csv(path : str) -> np.ndarray:
+    with open(path) as file:
+        header = [column.strip() for column in file.readline().split(',')]
+        # every column is parsed in the same pass, kinds as text and the rest as numbers
+        dtype = [(column, 'U32' if column == 'kind' else '<f8') for column in header]
+        with warnings.catch_warnings():
+            # a file with the header only is an empty scenario
+            warnings.filterwarnings('ignore', 'loadtxt: input contained no data')
+            values = np.loadtxt(file, delimiter=',', dtype=dtype, ndmin=1)
+
+    columns = {column: values[column] for column in header}
+    if 'kind' in columns:
+        columns['kind'] = np.char.strip(columns['kind'])
+    return targets_from_columns(columns)
+
+
+def load_parquet(path : str) -> np.ndarray:
+    if pyarrow is None:
+        raise ImportError("Parquet scenarios need pyarrow, install it with: pip install pyarrow")
+    table = pyarrow.parquet.read_table(path)
+    return targets_from_columns({column: table.column(column).to_numpy() for column in table.column_names})
+
+
+def load_npy(path : str) -> np.ndarray:
+    array = np.load(path)
+    if array.dtype.names is None:
+        raise ValueError(f"{path} does not hold a structured array of targets")
+    return targets_from_columns({column: array[column] for column in array.dtype.names})
+
+
+def load_scenario(path : str) -> np.ndarray:
+    if path.endswith('.csv'):
+        return load_csv(path)
+    if path.endswith('.parquet'):
+        return load_parquet(path)
+    if path.endswith('.npy'):
+        return load_npy(path)
+    raise ValueError(f"Unsupported scenario format of {path}, expected .csv, .parquet or .npy")
+
+
+def save_scenario(path : str, targets : np.ndarray) -> None:
+    if path.endswith('.npy'):
+        np.save(path, targets)
+    elif path.endswith('.csv'):
+        columns = REQUIRED_COLUMNS + MOTION_COLUMNS + COLOR_COLUMNS
+        values = np.column_stack([targets[column] for column in REQUIRED_COLUMNS + MOTION_COLUMNS] + [targets['color']])
+        np.savetxt(path, values, delimiter=',', header=','.join(columns), comments='',
+         fmt=['%d'] + ['%.6g'] * (len(REQUIRED_COLUMNS) + len(MOTION_COLUMNS) - 1) + ['%d'] * len(COLOR_COLUMNS))
+    elif path.endswith('.parquet'):
+        if pyarrow is None:
+            raise ImportError("Parquet scenarios need pyarrow, install it with: pip install pyarrow")
+        columns = {column: targets[column] for column in REQUIRED_COLUMNS + MOTION_COLUMNS}
+        columns.update({column: targets['color'][:, channel] for channel, column in enumerate(COLOR_COLUMNS)})
+        pyarrow.parquet.write_table(pyarrow.table(columns), path)
+    else:
+        raise ValueError(f"Unsupported scenario format of {path}, expected .csv, .parquet or .npy")
+
+
+def random_targets(count : int, seed : int = None, width : int = MAP_WIDTH, height : int = MAP_HEIGHT,
+ objects_speed : int = OBJECTS_DEFAULT_SPEED, kinds : 'tuple[Type[Shape], ...]' = (Ellipse,),
+ color : 'tuple[int, ...]' = DEFAULT_COLOR) -> np.ndarray:
+    # the same ranges as the Shape.randomize_* helpers, drawn for all targets at once
+    rng = np.random.default_rng(seed)
+    targets = np.zeros(count, dtype=SCENARIO_DTYPE)
+    targets['kind'] = rng.choice([SHAPE_TYPES.index(kind) for kind in kinds], count)
+    targets['x'] = rng.integers(0, width, count)
+    targets['y'] = rng.integers(0, height, count)
+    targets['width'] = rng.integers(Shape.RECT_MIN_SIZE, Shape.RECT_MAX_SIZE, count)
+    targets['height'] = rng.integers(Shape.RECT_MIN_SIZE, Shape.RECT_MAX_SIZE, count)
+    targets['angle'] = rng.integers(0, 360, count)
+    if objects_speed:
+        targets['delta_x'] = rng.integers(-objects_speed, objects_speed, count)
+        targets['delta_y'] = rng.integers(-objects_speed, objects_speed, count)
+        targets['delta_angle'] = rng.integers(-3, 4, count)
+    targets['color'] = tuple(color) + (255,) * (4 - len(color))
+    return targets
+
+
+def clustered_targets(count : int, clusters : int, seed : int = None, spread : float = SWEEP_LENGTH / 5, width : int = MAP_WIDTH,
+ height : int = MAP_HEIGHT, objects_speed : int = OBJECTS_DEFAULT_SPEED, kinds : 'tuple[Type[Shape], ...]' = (Ellipse,),
+ color : 'tuple[int, ...]' = DEFAULT_COLOR) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    targets = random_targets(count, rng.integers(2 ** 63), width, height, objects_speed, kinds, color)
+    centers_x = rng.uniform(0, width, clusters)
+    centers_y = rng.uniform(0, height, clusters)
+    cluster = rng.integers(0, clusters, count)
+    targets['x'] = np.clip(rng.normal(centers_x[cluster], spread), 0, width)
+    targets['y'] = np.clip(rng.normal(centers_y[cluster], spread), 0, height)
+    return targets
@@ -1,12 +1,18 @@
 from __future__ import annotations
-import arcade
 import random
+from typing import TYPE_CHECKING
 from simulation.utils import Point2D, PointHelper
 from simulation.config import *
 
+if TYPE_CHECKING:
+    import arcade
+
 class Shape:
+    __slots__ = ('x', 'y', 'width', 'height', 'angle', 'delta_x', 'delta_y', 'delta_angle', 'color', 'moving', '__shape_list')
+
     RECT_MAX_SIZE = 30
     RECT_MIN_SIZE = 10
+    MOVING = True
 
     def __init__(self, x, y, width, height, angle, delta_x, delta_y,
                  delta_angle, color) -> None:
@@ -19,8 +25,22 @@ class Shape:
         self.delta_y = delta_y
         self.delta_angle = delta_angle
         self.color = color
-        self.shape_list = None
-        self.moving = True
+        self.moving = self.MOVING
+        self.__shape_list = None
+
+    @property
+    def shape_list(self) -> arcade.ShapeElementList:
+        if self.__shape_list is None:
+            shape = self.create_shape()
+            if shape is None:
+                return None
+            import arcade
+            self.__shape_list = arcade.ShapeElementList()
+            self.__shape_list.append(shape)
+        return self.__shape_list
+
+    def create_shape(self) -> arcade.Shape:
+        return None
 
     def move(self) -> None:
         self.x += self.delta_x
@@ -45,100 +65,87 @@ class Shape:
         return PointHelper.is_point_in_triangle(Point2D(self.x, self.y), v1, v2, v3)
 
     def from_shape(self, instance : Shape) -> Shape:
-        return Shape(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, arcade.color.GREEN)
+        return Shape(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, DISCOVERED_COLOR)
 
     @staticmethod
-    def randomize_movement(speed : int) -> 'tuple[int, int, int]':
+    def randomize_movement(speed : int, rng : random.Random = random) -> 'tuple[int, int, int]':
         if speed == 0:
             return (0, 0, 0)
 
-        d_x = random.randrange(-1 * speed, 1 * speed)
-        d_y = random.randrange(-1 * speed, 1 * speed)
-        d_angle = random.randrange(-3, 4)
+        d_x = rng.randrange(-1 * speed, 1 * speed)
+        d_y = rng.randrange(-1 * speed, 1 * speed)
+        d_angle = rng.randrange(-3, 4)
 
         return (d_x, d_y, d_angle)
 
     @staticmethod
-    def randomize_position(screen_width : int, screen_height : int) -> 'tuple[int, int]':
-        x = random.randrange(0, screen_width)
-        y = random.randrange(0, screen_height)
+    def randomize_position(screen_width : int, screen_height : int, rng : random.Random = random) -> 'tuple[int, int]':
+        x = rng.randrange(0, screen_width)
+        y = rng.randrange(0, screen_height)
 
         return (x, y)
 
     @staticmethod
-    def randomize_size() -> 'tuple[int, int]':
-        width = random.randrange(Shape.RECT_MIN_SIZE, Shape.RECT_MAX_SIZE)
-        height = random.randrange(Shape.RECT_MIN_SIZE, Shape.RECT_MAX_SIZE)
+    def randomize_size(rng : random.Random = random) -> 'tuple[int, int]':
+        width = rng.randrange(Shape.RECT_MIN_SIZE, Shape.RECT_MAX_SIZE)
+        height = rng.randrange(Shape.RECT_MIN_SIZE, Shape.RECT_MAX_SIZE)
 
         return (width, height)
 
     @staticmethod
-    def randomize_angle() -> int:
-        return random.randrange(0, 360)
+    def randomize_angle(rng : random.Random = random) -> int:
+        return rng.randrange(0, 360)
 
 
 class Ellipse(Shape):
+    __slots__ = ()
 
-    def __init__(self, x, y, width, height, angle, delta_x, delta_y,
-                 delta_angle, color) -> None:
-
-        super().__init__(x, y, width, height, angle, delta_x, delta_y,
-                         delta_angle, color)
+    def create_shape(self) -> arcade.Shape:
+        import arcade
+        return arcade.create_ellipse_filled(0, 0,
+                                            self.width, self.height,
+                                            self.color, self.angle)
 
-        shape = arcade.create_ellipse_filled(0, 0,
-                                             self.width, self.height,
-                                             self.color, self.angle)
-        self.shape_list = arcade.ShapeElementList()
-        self.shape_list.append(shape)
-    
     def from_shape(self, instance : Shape) -> Shape:
-        return Ellipse(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, arcade.color.GREEN)
+        return Ellipse(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, DISCOVERED_COLOR)
 
 
 
 class Rectangle(Shape):
+    __slots__ = ()
 
-    def __init__(self, x, y, width, height, angle, delta_x, delta_y,
-                 delta_angle, color) -> None:
-
-        super().__init__(x, y, width, height, angle, delta_x, delta_y,
-                         delta_angle, color)
-
-        shape = arcade.create_rectangle_filled(0, 0,
-                                               self.width, self.height,
-                                               self.color, self.angle)
-        self.shape_list = arcade.ShapeElementList()
-        self.shape_list.append(shape)
+    def create_shape(self) -> arcade.Shape:
+        import arcade
+        return arcade.create_rectangle_filled(0, 0,
+                                              self.width, self.height,
+                                              self.color, self.angle)
 
     def from_shape(self, instance : Shape) -> Shape:
-        return Rectangle(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, arcade.color.GREEN)
+        return Rectangle(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, DISCOVERED_COLOR)
 
 
 class Line(Shape):
+    __slots__ = ()
 
-    def __init__(self, x, y, width, height, angle, delta_x, delta_y,
-                 delta_angle, color) -> None:
-
-        super().__init__(x, y, width, height, angle, delta_x, delta_y,
-                         delta_angle, color)
-
-        shape = arcade.create_line(0, 0,
-                                   self.width, self.height,
-                                   self.color, 2)
-        self.shape_list = arcade.ShapeElementList()
-        self.shape_list.append(shape)
+    def create_shape(self) -> arcade.Shape:
+        import arcade
+        return arcade.create_line(0, 0,
+                                  self.width, self.height,
+                                  self.color, 2)
 
     def from_shape(self, instance : Shape) -> Shape:
-        return Line(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, arcade.color.GREEN)
+        return Line(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, DISCOVERED_COLOR)
 
 class StableRectangle(Rectangle):
-    def __init__(self, x, y, width, height, angle, delta_x, delta_y, delta_angle, color) -> None:
-        super().__init__(x, y, width, height, angle, delta_x, delta_y, delta_angle, color)
+    __slots__ = ()
 
-        self.moving = False
+    MOVING = False
 
     def from_shape(self, instance : Shape) -> Shape:
-        return StableRectangle(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, arcade.color.GREEN)
+        return StableRectangle(instance.x, instance.y, instance.width, instance.height, instance.angle, instance.delta_x, instance.delta_y, instance.delta_angle, DISCOVERED_COLOR)
 
     def move(self) -> None:
-        pass
\ No newline at end of file
+        pass
+
+
+SHAPE_TYPES : 'tuple[type[Shape], ...]' = (Shape, Ellipse, Rectangle, Line, StableRectangle)
@@ -0,0 +1,162 @@
+import multiprocessing
+import numpy as np
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Type
+from simulation.core import SimulationCore, move_shapes
+from simulation.detection import stations_swept_mask
+from simulation.shapes import Shape
+from simulation.station import station_arrays
+from simulation.config import *
+
+SHARED_FIELDS = (
+    ('x', np.float64),
+    ('y', np.float64),
+    ('previous_x', np.float64),
+    ('previous_y', np.float64),
+    ('shape_angle', np.float64),
+    ('delta_x', np.float64),
+    ('delta_y', np.float64),
+    ('delta_angle', np.float64),
+    ('moving', np.bool_),
+)
+
+
+class SharedArrays:
+    def __init__(self, capacity : int, name : str = None) -> None:
+        size = sum(capacity * np.dtype(dtype).itemsize for _, dtype in SHARED_FIELDS)
+        self.capacity = capacity
+        self.memory = SharedMemory(name=name, create=name is None, size=size)
+        self.name = self.memory.name
+        self.arrays : 'dict[str, np.ndarray]' = {}
+
+        offset = 0
+        for field, dtype in SHARED_FIELDS:
+            self.arrays[field] = np.ndarray(capacity, dtype=dtype, buffer=self.memory.buf, offset=offset)
+            offset += capacity * np.dtype(dtype).itemsize
+
+    def close(self) -> None:
+        self.arrays.clear()
+        self.memory.close()
+
+
+def shard_of(x : np.ndarray, width : float, shards : int) -> np.ndarray:
+    return np.clip((x * shards // width).astype(np.int32), 0, shards - 1)
+
+
+def shard_worker(connection : Connection, name : str, capacity : int, shard : int, shards : int, width : float, height : float) -> None:
+    shared = SharedArrays(capacity, name)
+    state = shared.arrays
+    owned = np.zeros(0, dtype=np.intp)
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        stations, incoming = message
+        owned = np.concatenate([owned, incoming])
+
+        x, y = state['x'][owned], state['y'][owned]
+        previous_x, previous_y = x.copy(), y.copy()
+        shape_angle = state['shape_angle'][owned]
+        delta_x, delta_y = state['delta_x'][owned], state['delta_y'][owned]
+        state['previous_x'][owned] = x
+        state['previous_y'][owned] = y
+        move_shapes(x, y, shape_angle, delta_x, delta_y, state['delta_angle'][owned], state['moving'][owned], width, height)
+        state['x'][owned], state['y'][owned], state['shape_angle'][owned] = x, y, shape_angle
+        state['delta_x'][owned], state['delta_y'][owned] = delta_x, delta_y
+
+        detected = [owned[row] for row in stations_swept_mask(previous_x, previous_y, x, y, *stations)]
+
+        # shapes that crossed a border are moved by this shard once more, then handed over for the next tick
+        targets = shard_of(x, width, shards)
+        leaving = targets != shard
+        connection.send((detected, owned[leaving], targets[leaving]))
+        owned = owned[~leaving]
+
+    del state
+    shared.close()
+    connection.close()
+
+
+class ShardedSimulation(SimulationCore):
+    def __init__(self, capacity : int, shards : int = None, width : int = MAP_WIDTH, height : int = MAP_HEIGHT,
+     speed : float = RADIANS_PER_FRAME, radar_range : float = RADAR_RANGE, objects_speed : int = OBJECTS_DEFAULT_SPEED,
+     seed : int = None) -> None:
+        super().__init__(width, height, speed, radar_range, objects_speed, seed=seed, capacity=capacity)
+        self.shards = shards or multiprocessing.cpu_count()
+        self.shared = SharedArrays(capacity)
+        for field, _ in SHARED_FIELDS:
+            setattr(self, field, self.shared.arrays[field])
+        self.pending : 'list[list[int]]' = [[] for _ in range(self.shards)]
+
+        self.connections : 'list[Connection]' = []
+        self.workers : 'list[multiprocessing.Process]' = []
+        for shard in range(self.shards):
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=shard_worker, daemon=True,
+             args=(worker_connection, self.shared.name, capacity, shard, self.shards, width, height))
+            worker.start()
+            self.connections.append(connection)
+            self.workers.append(worker)
+
+    def __enter__(self) -> 'ShardedSimulation':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def add(self, shape_class : Type[Shape], x : float, y : float, width : float, height : float, angle : float,
+     delta_x : float, delta_y : float, delta_angle : float, color : 'tuple[int, ...]' = SimulationCore.DEFAULT_COLOR) -> int:
+        if self.count == self.capacity:
+            raise ValueError(f"Sharded simulation is full ({self.capacity} shapes)")
+        index = super().add(shape_class, x, y, width, height, angle, delta_x, delta_y, delta_angle, color)
+        self.pending[int(shard_of(np.array([x]), self.width, self.shards)[0])].append(index)
+        return index
+
+    def add_targets(self, targets : np.ndarray) -> np.ndarray:
+        if self.count + len(targets) > self.capacity:
+            raise ValueError(f"Sharded simulation is full ({self.capacity} shapes)")
+        indices = super().add_targets(targets)
+        shards = shard_of(targets['x'], self.width, self.shards)
+        for shard in range(self.shards):
+            self.pending[shard].extend(indices[shards == shard].tolist())
+        return indices
+
+    def restore(self, *_) -> None:
+        # a restore may reallocate the arrays off the shared memory, and the workers would keep moving the old ones
+        raise NotImplementedError("Sharded simulations cannot restore recorded frames, replay into a SimulationCore")
+
+    def simulate(self) -> np.ndarray:
+        stations = station_arrays(self.stations)
+        self.profiler.count('shapes_tested', self.count * len(self.stations))
+        for shard, connection in enumerate(self.connections):
+            connection.send((stations, np.array(self.pending[shard], dtype=np.intp)))
+            self.pending[shard] = []
+
+        detected = [[] for _ in self.stations]
+        for connection in self.connections:
+            shard_detected, leaving, targets = connection.recv()
+            for station_detected, indices in zip(detected, shard_detected):
+                station_detected.append(indices)
+            for index, target in zip(leaving.tolist(), targets.tolist()):
+                self.pending[target].append(index)
+
+        self.station_detections = [np.sort(np.concatenate(indices)) for indices in detected]
+        return np.unique(np.concatenate(self.station_detections))
+
+    def close(self) -> None:
+        if not self.workers:
+            return
+        for connection in self.connections:
+            connection.send(None)
+        for worker in self.workers:
+            worker.join()
+        for connection in self.connections:
+            connection.close()
+        self.workers = []
+
+        for field, _ in SHARED_FIELDS:
+            setattr(self, field, getattr(self, field).copy())
+        self.shared.close()
+        self.shared.memory.unlink()
@@ -0,0 +1,93 @@
+import itertools
+import math
+import numpy as np
+from simulation.config import *
+
+
+class AngularIndex:
+    OUTSIDE = -1
+
+    def __init__(self, center_x : float, center_y : float, max_radius : float = SWEEP_LENGTH, buckets_number : int = ANGULAR_BUCKETS,
+     near_radius : float = INDEX_NEAR_RADIUS) -> None:
+        self.center_x = center_x
+        self.center_y = center_y
+        self.max_radius = max_radius
+        self.near_radius = near_radius
+        self.buckets_number = buckets_number
+        self.bucket_width = 2 * math.pi / buckets_number
+        # the extra last bucket holds shapes near the center, where bearings change quickly; every query includes it
+        self.center_bucket = buckets_number
+        self.buckets : 'list[set[int]]' = [set() for _ in range(buckets_number + 1)]
+        self.bucket_of = np.full(0, self.OUTSIDE, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self.buckets)
+
+    def bucket_indices(self, x : np.ndarray, y : np.ndarray, margin : float = 0.0) -> np.ndarray:
+        dx = x - self.center_x
+        dy = y - self.center_y
+        bearing = np.arctan2(dx, dy) % (2 * math.pi)
+        buckets = np.minimum((bearing / self.bucket_width).astype(np.int32), self.buckets_number - 1)
+        distance_squared = dx * dx + dy * dy
+        buckets[distance_squared <= self.near_radius * self.near_radius] = self.center_bucket
+        outer_radius = self.max_radius + margin
+        buckets[distance_squared >= outer_radius * outer_radius] = self.OUTSIDE
+        return buckets
+
+    def reserve(self, capacity : int) -> None:
+        if capacity > len(self.bucket_of):
+            grown = np.full(max(2 * len(self.bucket_of), capacity), self.OUTSIDE, dtype=np.int32)
+            grown[:len(self.bucket_of)] = self.bucket_of
+            self.bucket_of = grown
+
+    def insert(self, index : int, x : float, y : float) -> None:
+        self.reserve(index + 1)
+
+        bucket = int(self.bucket_indices(np.array([x]), np.array([y]))[0])
+        self.bucket_of[index] = bucket
+        if bucket != self.OUTSIDE:
+            self.buckets[bucket].add(index)
+
+    def update(self, x : np.ndarray, y : np.ndarray, margin : float = 0.0, rows : np.ndarray = None) -> None:
+        # shapes up to margin beyond max_radius stay indexed, their last step may have started inside;
+        # when rows are given only those shapes moved, the buckets of the others are kept
+        if rows is None:
+            rows = np.arange(len(x))
+        new_buckets = self.bucket_indices(x[rows], y[rows], margin)
+        old_buckets = self.bucket_of[rows]
+        moved = new_buckets != old_buckets
+        changed, old_buckets, new_buckets = rows[moved], old_buckets[moved], new_buckets[moved]
+
+        for index, old_bucket, new_bucket in zip(changed.tolist(), old_buckets.tolist(), new_buckets.tolist()):
+            if old_bucket != self.OUTSIDE:
+                self.buckets[old_bucket].discard(index)
+            if new_bucket != self.OUTSIDE:
+                self.buckets[new_bucket].add(index)
+        self.bucket_of[changed] = new_buckets
+
+    def truncate(self, count : int) -> None:
+        removed = np.flatnonzero(self.bucket_of[count:] != self.OUTSIDE) + count
+        for index, bucket in zip(removed.tolist(), self.bucket_of[removed].tolist()):
+            self.buckets[bucket].discard(index)
+        self.bucket_of[count:] = self.OUTSIDE
+
+    def sector_buckets(self, angle : float, radar_range : float) -> 'list[int]':
+        first = math.floor((angle % (2 * math.pi)) / self.bucket_width)
+        last = math.floor((angle % (2 * math.pi) + radar_range) / self.bucket_width)
+        if last - first + 1 >= self.buckets_number:
+            return list(range(self.buckets_number + 1))
+
+        return [bucket % self.buckets_number for bucket in range(first, last + 1)] + [self.center_bucket]
+
+    def bearing_margin(self, step : float) -> float:
+        # a shape that ends a step outside of near_radius turned by at most asin(step / near_radius) around the center,
+        # longer steps can come from any bearing
+        if step >= self.near_radius:
+            return math.pi
+        return math.asin(step / self.near_radius)
+
+    def query(self, angle : float, radar_range : float) -> np.ndarray:
+        buckets = (self.buckets[bucket] for bucket in self.sector_buckets(angle, radar_range))
+        candidates = np.fromiter(itertools.chain.from_iterable(buckets), dtype=np.intp)
+        candidates.sort()
+        return candidates
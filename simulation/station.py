@@ -0,0 +1,62 @@
+import math
+import numpy as np
+from simulation.config import *
+
+
+class RadarStation:
+    def __init__(self, x : float = CENTER_X, y : float = CENTER_Y, speed : float = RADIANS_PER_FRAME, radar_range : float = RADAR_RANGE,
+     sweep_length : float = SWEEP_LENGTH, waves_number : int = RADAR_WAVES_NUMBER, angle : float = 0.0, wave_delay : float = WAVE_DELAY_S) -> None:
+        if waves_number < 1:
+            raise ValueError(f"A radar station needs at least one wave, got {waves_number}")
+        self.x = x
+        self.y = y
+        self.speed = speed
+        self.radar_range = radar_range
+        self.sweep_length = sweep_length
+        self.angle = angle
+        self.previous_angle = angle
+        self.wave_radii = np.full(waves_number, INIT_WAVE_RADIUS, dtype=np.float64)
+        self.wave_start_ticks = np.arange(waves_number) * wave_delay * TICKS_PER_SECOND
+
+    @property
+    def detection_radius(self) -> float:
+        return min(self.sweep_length, self.wave_radii.max())
+
+    def step(self, tick : int) -> None:
+        self.previous_angle = self.angle
+        self.angle = (self.angle + self.speed) % (2 * math.pi)
+
+        started = self.wave_start_ticks < tick
+        in_range = self.wave_radii <= self.sweep_length
+        self.wave_radii[started & in_range] += RADIUS_DELTA
+        self.wave_radii[started & ~in_range] = INIT_WAVE_RADIUS
+
+    def swept_interval(self) -> 'tuple[float, float]':
+        # bearings covered by the beam since the previous tick, as a start angle and a width
+        return self.previous_angle + min(self.speed, 0.0), abs(self.speed) + self.radar_range
+
+    def started_waves(self, tick : int) -> np.ndarray:
+        return self.wave_radii[self.wave_start_ticks < tick]
+
+    def interpolated_angle(self, alpha : float = 1.0) -> float:
+        turn = (self.angle - self.previous_angle) % (2 * math.pi)
+        if self.speed < 0 and turn:
+            turn -= 2 * math.pi
+        return self.previous_angle + alpha * turn
+
+    def sweep_vertices(self, angle : float = None) -> 'tuple[float, float, float, float]':
+        angle = self.angle if angle is None else angle
+        x1 = self.sweep_length * math.sin(angle) + self.x
+        y1 = self.sweep_length * math.cos(angle) + self.y
+        x2 = self.sweep_length * math.sin(angle + self.radar_range) + self.x
+        y2 = self.sweep_length * math.cos(angle + self.radar_range) + self.y
+        return x1, y1, x2, y2
+
+
+def station_arrays(stations : 'list[RadarStation]') -> 'tuple[np.ndarray, ...]':
+    return (np.array([station.x for station in stations], dtype=np.float64),
+            np.array([station.y for station in stations], dtype=np.float64),
+            np.array([station.previous_angle for station in stations], dtype=np.float64),
+            np.array([station.speed for station in stations], dtype=np.float64),
+            np.array([station.radar_range for station in stations], dtype=np.float64),
+            np.array([station.detection_radius for station in stations], dtype=np.float64))
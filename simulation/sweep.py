@@ -0,0 +1,181 @@
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+from dataclasses import dataclass, asdict, fields
+from typing import Iterable
+from simulation.core import SimulationCore
+from simulation.scenario import random_targets
+from simulation.config import *
+
+SWEEP_VERSION = 1 # bump when the simulation or the metrics change, so cached results are not reused
+DEFAULT_TARGETS = 200
+DEFAULT_DURATION_S = 20.0
+PARAMETERS = ('speed', 'radar_range', 'refresh_time', 'wave_delay', 'objects_speed')
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    speed : float = RADIANS_PER_FRAME
+    radar_range : float = RADAR_RANGE
+    refresh_time : float = RADAR_REFRESH_TIME
+    wave_delay : float = WAVE_DELAY_S
+    objects_speed : int = OBJECTS_DEFAULT_SPEED
+    seed : int = 0
+    targets : int = DEFAULT_TARGETS
+    ticks : int = int(DEFAULT_DURATION_S * TICKS_PER_SECOND)
+
+    @property
+    def key(self) -> str:
+        payload = json.dumps({'version': SWEEP_VERSION, **asdict(self)}, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+
+@dataclass
+class SweepMetrics:
+    detection_rate : float
+    time_to_first_detect_s : float
+    missed_contacts : int
+    undetected_targets : int
+    detections_per_target_s : float
+    ticks_per_second : float
+
+
+def config_grid(speeds : Iterable[float], radar_ranges : Iterable[float], refresh_times : Iterable[float],
+ wave_delays : Iterable[float], objects_speeds : Iterable[int], seeds : Iterable[int], targets : int = DEFAULT_TARGETS,
+ ticks : int = int(DEFAULT_DURATION_S * TICKS_PER_SECOND)) -> 'list[SweepConfig]':
+    # values are normalized, so 1 and 1.0 hash to the same cached run
+    return [SweepConfig(float(speed), float(radar_range), float(refresh_time), float(wave_delay), int(objects_speed), int(seed),
+     int(targets), int(ticks)) for
+     speed, radar_range, refresh_time, wave_delay, objects_speed, seed
+     in itertools.product(speeds, radar_ranges, refresh_times, wave_delays, objects_speeds, seeds)]
+
+
+def run_config(config : SweepConfig) -> 'tuple[SweepConfig, SweepMetrics]':
+    core = SimulationCore(speed=config.speed, radar_range=config.radar_range, objects_speed=config.objects_speed, seed=config.seed,
+     capacity=config.targets, refresh_time=config.refresh_time, wave_delay=config.wave_delay)
+    core.add_targets(random_targets(config.targets, config.seed, objects_speed=config.objects_speed))
+    station, n = core.station, config.targets
+    refresh_ticks = config.refresh_time * TICKS_PER_SECOND
+
+    # a target is covered while it is within the sweep length of the station
+    def covered() -> np.ndarray:
+        return np.hypot(core.x[:n] - station.x, core.y[:n] - station.y) <= station.sweep_length
+
+    in_range = covered()
+    first_covered = np.where(in_range, 0, -1)
+    first_detected = np.full(n, -1)
+    # tick of the last detection, or of the last tick spent out of range
+    last_refresh = np.zeros(n, dtype=np.int64)
+    overdue = np.zeros(n, dtype=np.bool_)
+    missed = detections = 0
+
+    started = time.perf_counter()
+    for _ in range(config.ticks):
+        core.step()
+        tick, detected = core.tick, core.detected
+        in_range = covered()
+        first_covered[(first_covered < 0) & in_range] = tick
+        first_detected[detected[first_detected[detected] < 0]] = tick
+        last_refresh[~in_range] = tick
+        last_refresh[detected] = tick
+        overdue[detected] = False
+        detections += len(detected)
+
+        # a contact is missed once it stays in range longer than the refresh time without being detected again
+        late = in_range & ~overdue & (first_detected >= 0) & (tick - last_refresh > refresh_ticks)
+        missed += int(np.count_nonzero(late))
+        overdue |= late
+    elapsed = time.perf_counter() - started
+
+    seen = first_covered >= 0
+    found = seen & (first_detected >= 0)
+    delays = (first_detected[found] - first_covered[found]) / TICKS_PER_SECOND
+    return config, SweepMetrics(
+        detection_rate=float(found.sum() / seen.sum()) if seen.any() else 0.0,
+        time_to_first_detect_s=float(delays.mean()) if len(delays) else float('nan'),
+        missed_contacts=missed,
+        undetected_targets=int(np.count_nonzero(seen & ~found)),
+        detections_per_target_s=detections / n / (config.ticks / TICKS_PER_SECOND) if n and config.ticks else 0.0,
+        ticks_per_second=config.ticks / elapsed if elapsed else float('inf'),
+    )
+
+
+def load_cache(path : str) -> 'dict[str, SweepMetrics]':
+    cache = {}
+    if not os.path.exists(path):
+        return cache
+    with open(path) as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # the last line of an interrupted sweep may be cut short
+                continue
+            cache[entry['key']] = SweepMetrics(**entry['metrics'])
+    return cache
+
+
+def run_sweep(configs : 'list[SweepConfig]', cache_path : str = None, processes : int = None,
+ progress : bool = False) -> 'list[tuple[SweepConfig, SweepMetrics]]':
+    cache = load_cache(cache_path) if cache_path else {}
+    pending = list({config.key: config for config in configs if config.key not in cache}.values())
+    if progress:
+        print(f"{len(configs) - len(pending)} cached, {len(pending)} to run")
+
+    if pending:
+        cache_file = open(cache_path, 'ab+') if cache_path else None
+        if cache_file and cache_file.seek(0, os.SEEK_END):
+            cache_file.seek(-1, os.SEEK_END)
+            if cache_file.read(1) != b'\n':
+                # the cut line of an interrupted sweep is closed, so it does not swallow the next run
+                cache_file.write(b'\n')
+        try:
+            with multiprocessing.Pool(processes) as pool:
+                chunk_size = max(1, len(pending) // (4 * (processes or multiprocessing.cpu_count())))
+                for done, (config, metrics) in enumerate(pool.imap_unordered(run_config, pending, chunk_size), 1):
+                    cache[config.key] = metrics
+                    if cache_file:
+                        # every run is flushed on its own line, so an interrupted sweep resumes from the last finished one
+                        entry = {'key': config.key, 'config': asdict(config), 'metrics': asdict(metrics)}
+                        cache_file.write(json.dumps(entry).encode() + b'\n')
+                        cache_file.flush()
+                    if progress:
+                        print(f"\r{done}/{len(pending)}", end='', flush=True)
+        finally:
+            if cache_file:
+                cache_file.close()
+            if progress:
+                print()
+
+    return [(config, cache[config.key]) for config in configs]
+
+
+def aggregate(results : 'list[tuple[SweepConfig, SweepMetrics]]') -> 'list[dict]':
+    # one row per parameter combination, the metrics are averaged over the seeds
+    groups : 'dict[tuple, list[SweepMetrics]]' = {}
+    for config, metrics in results:
+        groups.setdefault(tuple(getattr(config, parameter) for parameter in PARAMETERS) + (config.targets, config.ticks), []).append(metrics)
+
+    rows = []
+    for group, metrics in groups.items():
+        row = dict(zip(PARAMETERS + ('targets', 'ticks'), group))
+        row['runs'] = len(metrics)
+        for field in fields(SweepMetrics):
+            values = np.array([getattr(run, field.name) for run in metrics], dtype=np.float64)
+            row[field.name] = float(np.nanmean(values)) if np.isfinite(values).any() else float('nan')
+        rows.append(row)
+    return rows
+
+
+def export_csv(rows : 'list[dict]', path : str) -> None:
+    if not rows:
+        return
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
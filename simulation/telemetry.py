@@ -0,0 +1,289 @@
+import asyncio
+import socket
+import struct
+import threading
+import time
+import numpy as np
+from collections import deque
+from simulation.core import SimulationCore
+from simulation.config import *
+
+# every frame is a little endian payload length followed by the payload:
+# the header, one STATION_DTYPE record per station, then four sections, each a count followed by its columns:
+# removed ids, added ids with absolute positions, moved ids with position differences, and ids detected since the previous frame
+FRAME_HEADER = struct.Struct("<I")
+SNAPSHOT_HEADER = struct.Struct("<BIIH")
+SECTION_HEADER = struct.Struct("<I")
+KEYFRAME = 0
+DELTA = 1
+
+STATION_DTYPE = np.dtype([
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('angle', '<f4'),
+    ('radar_range', '<f4'),
+])
+
+SECTION_COLUMNS = (
+    ('removed', ('<u4',)),
+    ('added', ('<u4', '<i4', '<i4')),
+    ('moved', ('<u4', '<i2', '<i2')),
+    ('detected', ('<u4',)),
+)
+
+
+class Snapshot:
+    __slots__ = ('sequence', 'tick', 'stations', 'ids', 'x', 'y', 'detected', 'encoded')
+
+    def __init__(self, sequence : int, tick : int, stations : np.ndarray, ids : np.ndarray, x : np.ndarray, y : np.ndarray,
+     detected : np.ndarray) -> None:
+        self.sequence = sequence
+        self.tick = tick
+        self.stations = stations
+        self.ids = ids
+        self.x = x
+        self.y = y
+        self.detected = detected
+        # frames already encoded against a base sequence, shared by every client at the same point
+        self.encoded : 'dict[int, bytes]' = {}
+
+
+def quantize(values : np.ndarray) -> np.ndarray:
+    return np.round(values * TELEMETRY_POSITION_SCALE).astype(np.int32)
+
+
+def section(*columns : np.ndarray) -> bytes:
+    return SECTION_HEADER.pack(len(columns[0])) + b''.join(np.ascontiguousarray(column).tobytes() for column in columns)
+
+
+def encode_snapshot(snapshot : Snapshot, base : Snapshot = None, detected : np.ndarray = None) -> bytes:
+    detected = snapshot.detected if detected is None else detected
+    added = np.ones(len(snapshot.ids), dtype=np.bool_)
+    if base is not None:
+        _, current, previous = np.intersect1d(snapshot.ids, base.ids, assume_unique=True, return_indices=True)
+        delta_x = snapshot.x[current] - base.x[previous]
+        delta_y = snapshot.y[current] - base.y[previous]
+        limit = np.iinfo(np.int16).max
+        if len(current) and max(np.abs(delta_x).max(), np.abs(delta_y).max()) > limit:
+            # a jump too long for the compact differences, the client gets a keyframe instead
+            base = None
+        else:
+            added[current] = False
+            removed = np.setdiff1d(base.ids, snapshot.ids, assume_unique=True)
+            changed = (delta_x != 0) | (delta_y != 0)
+            moved, delta_x, delta_y = current[changed], delta_x[changed], delta_y[changed]
+
+    if base is None:
+        removed = moved = np.zeros(0, dtype=np.intp)
+        delta_x = delta_y = np.zeros(0, dtype=np.int32)
+
+    payload = b''.join((
+        SNAPSHOT_HEADER.pack(KEYFRAME if base is None else DELTA, snapshot.tick, 0 if base is None else base.tick, len(snapshot.stations)),
+        snapshot.stations.tobytes(),
+        section(np.asarray(removed, dtype='<u4')),
+        section(snapshot.ids[added].astype('<u4'), snapshot.x[added].astype('<i4'), snapshot.y[added].astype('<i4')),
+        section(snapshot.ids[moved].astype('<u4'), delta_x.astype('<i2'), delta_y.astype('<i2')),
+        section(np.asarray(detected, dtype='<u4')),
+    ))
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_snapshot(payload : bytes) -> dict:
+    kind, tick, base_tick, stations_number = SNAPSHOT_HEADER.unpack_from(payload)
+    offset = SNAPSHOT_HEADER.size
+    stations = np.frombuffer(payload, STATION_DTYPE, stations_number, offset)
+    offset += stations.nbytes
+    frame = {'kind': kind, 'tick': tick, 'base_tick': base_tick, 'stations': stations}
+    for name, dtypes in SECTION_COLUMNS:
+        (count,) = SECTION_HEADER.unpack_from(payload, offset)
+        offset += SECTION_HEADER.size
+        columns = []
+        for dtype in dtypes:
+            columns.append(np.frombuffer(payload, dtype, count, offset))
+            offset += columns[-1].nbytes
+        frame[name] = columns[0] if len(columns) == 1 else tuple(columns)
+    return frame
+
+
+async def read_frame(reader : asyncio.StreamReader) -> bytes:
+    (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    return await reader.readexactly(length)
+
+
+class TelemetryDecoder:
+    def __init__(self) -> None:
+        self.tick = 0
+        self.stations = np.zeros(0, dtype=STATION_DTYPE)
+        self.ids = np.zeros(0, dtype=np.uint32)
+        self.x = np.zeros(0, dtype=np.int64)
+        self.y = np.zeros(0, dtype=np.int64)
+        self.detected = np.zeros(0, dtype=np.uint32)
+
+    @property
+    def positions(self) -> 'tuple[np.ndarray, np.ndarray]':
+        return self.x / TELEMETRY_POSITION_SCALE, self.y / TELEMETRY_POSITION_SCALE
+
+    def apply(self, payload : bytes) -> dict:
+        frame = decode_snapshot(payload)
+        if frame['kind'] == DELTA and frame['base_tick'] != self.tick:
+            raise ValueError(f"Delta frame based on tick {frame['base_tick']} cannot be applied at tick {self.tick}")
+
+        if frame['kind'] == KEYFRAME:
+            ids, x, y = np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        else:
+            kept = ~np.isin(self.ids, frame['removed'])
+            ids, x, y = self.ids[kept], self.x[kept], self.y[kept]
+            moved_ids, delta_x, delta_y = frame['moved']
+            order = np.argsort(ids)
+            moved = order[np.searchsorted(ids, moved_ids, sorter=order)]
+            x[moved] += delta_x
+            y[moved] += delta_y
+
+        added_ids, added_x, added_y = frame['added']
+        self.ids = np.concatenate([ids, added_ids])
+        self.x = np.concatenate([x, added_x])
+        self.y = np.concatenate([y, added_y])
+        self.tick = frame['tick']
+        self.stations = frame['stations']
+        self.detected = frame['detected']
+        return frame
+
+
+class TelemetryServer:
+    def __init__(self, core : SimulationCore, host : str = TELEMETRY_HOST, port : int = TELEMETRY_PORT, rate : float = TELEMETRY_RATE,
+     history : int = TELEMETRY_HISTORY) -> None:
+        self.core = core
+        self.host = host
+        self.port = port
+        self.interval = 1 / rate
+        self.clients = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.loop : asyncio.AbstractEventLoop = None
+        self.thread : threading.Thread = None
+        # snapshots and client wakeups are only touched from the server thread
+        self.snapshots : 'deque[Snapshot]' = deque(maxlen=history)
+        self.__wakeups : 'set[asyncio.Event]' = set()
+        self.__ready = threading.Event()
+        self.__error : OSError = None
+        self.__pending_detections : 'list[np.ndarray]' = []
+        self.__last_publish = -float('inf')
+        self.__next_sequence = 0
+
+    def __enter__(self) -> 'TelemetryServer':
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self.__run, name='telemetry', daemon=True)
+        self.thread.start()
+        self.__ready.wait()
+        if self.__error is not None:
+            self.thread.join()
+            self.thread = None
+            raise self.__error
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.thread = None
+
+    def publish(self) -> None:
+        # called by the simulation after every tick, the snapshot is copied here and encoded on the server thread
+        if self.thread is None or not self.clients:
+            self.__pending_detections = []
+            return
+        core = self.core
+        self.__pending_detections.append(core.ids[core.detected])
+        now = time.perf_counter()
+        if now - self.__last_publish < self.interval:
+            return
+        self.__last_publish = now
+
+        stations = np.zeros(len(core.stations), dtype=STATION_DTYPE)
+        stations['x'] = [station.x for station in core.stations]
+        stations['y'] = [station.y for station in core.stations]
+        stations['angle'] = [station.angle for station in core.stations]
+        stations['radar_range'] = [station.radar_range for station in core.stations]
+        n = core.count
+        snapshot = Snapshot(self.__next_sequence, core.tick, stations, core.ids[:n].astype(np.uint32), quantize(core.x[:n]),
+         quantize(core.y[:n]), np.unique(np.concatenate(self.__pending_detections)).astype(np.uint32))
+        self.__next_sequence += 1
+        self.__pending_detections = []
+        self.loop.call_soon_threadsafe(self.__store, snapshot)
+
+    def __run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            server = self.loop.run_until_complete(asyncio.start_server(self.__serve, self.host, self.port))
+        except OSError as error:
+            self.__error = error
+            self.__ready.set()
+            self.loop.close()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self.__ready.set()
+
+        try:
+            self.loop.run_forever()
+        finally:
+            server.close()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(server.wait_closed())
+            self.loop.close()
+
+    def __store(self, snapshot : Snapshot) -> None:
+        self.snapshots.append(snapshot)
+        for wakeup in self.__wakeups:
+            wakeup.set()
+
+    def __frame(self, snapshot : Snapshot, base : Snapshot) -> bytes:
+        base_sequence = -1 if base is None else base.sequence
+        if base_sequence not in snapshot.encoded:
+            # detections of the snapshots a slow client skipped are merged into its next frame
+            detected = [kept.detected for kept in self.snapshots if base_sequence < kept.sequence <= snapshot.sequence]
+            snapshot.encoded[base_sequence] = encode_snapshot(snapshot, base, np.unique(np.concatenate(detected)) if detected else None)
+        return snapshot.encoded[base_sequence]
+
+    async def __serve(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter) -> None:
+        wakeup = asyncio.Event()
+        self.__wakeups.add(wakeup)
+        self.clients += 1
+        # small buffers on both levels make a slow client fall behind here, where its updates can be coalesced
+        writer.transport.set_write_buffer_limits(TELEMETRY_WRITE_BUFFER)
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, TELEMETRY_WRITE_BUFFER)
+        # clients do not send anything, the read only ends when they disconnect
+        closed = asyncio.ensure_future(reader.read())
+        closed.add_done_callback(lambda _: wakeup.set())
+        base : Snapshot = None
+        try:
+            while True:
+                await wakeup.wait()
+                wakeup.clear()
+                if closed.done():
+                    break
+                # only the newest snapshot is sent, whatever arrived while the client was draining is coalesced into it
+                snapshot = self.snapshots[-1]
+                if base is not None:
+                    self.coalesced += snapshot.sequence - base.sequence - 1
+                writer.write(self.__frame(snapshot, base))
+                self.sent += 1
+                base = snapshot
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # a dropped client or the server shutting down, either way the connection is just closed
+            pass
+        finally:
+            closed.cancel()
+            self.__wakeups.discard(wakeup)
+            self.clients -= 1
+            writer.close()
@@ -0,0 +1,77 @@
+from collections import deque
+from dataclasses import dataclass
+import numpy as np
+from typing import Callable
+from simulation.core import SimulationCore
+from simulation.tracking import ContactTracker
+from simulation.recording import ReplayPlayer
+from simulation.wave import WavePool
+from simulation.config import *
+
+
+@dataclass
+class RadarListElement:
+    __slots__ = ('radar_time_stamp', 'shapes', 'ids')
+    radar_time_stamp : int
+    shapes : np.ndarray
+    ids : np.ndarray
+
+    def is_active(self, current_tick : int, lifetime : float = RADAR_REFRESH_TIME * TICKS_PER_SECOND) -> bool:
+        return current_tick - self.radar_time_stamp < lifetime
+
+
+def positions_snapshot(core : SimulationCore, contacts : np.ndarray) -> np.ndarray:
+    return np.stack((core.x[contacts], core.y[contacts]), axis=1)
+
+
+class RadarTick:
+    # one simulation tick of the radar without any drawing, shared by the window and the benchmark
+    def __init__(self, core : SimulationCore, objects_waves : WavePool = None,
+     snapshot : Callable[[SimulationCore, np.ndarray], np.ndarray] = positions_snapshot) -> None:
+        self.core = core
+        self.profiler = core.profiler
+        self.objects_waves = objects_waves or WavePool()
+        self.snapshot = snapshot
+        self.tracker = ContactTracker()
+        self.radar_discovered_objects : 'deque[RadarListElement]' = deque()
+        self.wave_verbosity_level = 0
+        self.replay_player : ReplayPlayer = None
+
+    def step(self) -> None:
+        profiler = self.profiler
+        if self.replay_player is not None:
+            self.replay_player.step()
+        else:
+            self.core.step()
+        with profiler.stage('tracking'):
+            detected = self.core.detected
+            self.tracker.update(self.core.tick, self.core.x[detected], self.core.y[detected])
+        with profiler.stage('objects_waves'):
+            self.objects_waves.update()
+        with profiler.stage('discoveries'):
+            self.__update_discoveries()
+        profiler.count('active_waves', len(self.objects_waves))
+        profiler.count('tracked_contacts', self.tracker.count)
+
+    def __update_discoveries(self) -> None:
+        if self.core.new_contacts:
+            new_contacts = np.array(self.core.new_contacts)
+            self.radar_discovered_objects.append(RadarListElement(self.core.tick, self.snapshot(self.core, new_contacts),
+             self.core.ids[new_contacts]))
+            if self.wave_verbosity_level == 1:
+                self.__spawn_waves(new_contacts)
+
+        # snapshots live exactly as long as the core's tracks, so the oldest batches are always the first to expire
+        lifetime = self.core.tracks.lifetime
+        while self.radar_discovered_objects and not self.radar_discovered_objects[0].is_active(self.core.tick, lifetime):
+            self.radar_discovered_objects.popleft()
+
+    def __spawn_waves(self, new_contacts : np.ndarray) -> None:
+        # every wave starts from the first station that detected its contact and stays within that station's range
+        core = self.core
+        for station, detections in zip(core.stations, core.station_detections):
+            found = np.isin(new_contacts, detections)
+            if found.any():
+                contacts = new_contacts[found]
+                self.objects_waves.spawn(core.x[contacts], core.y[contacts], station.x, station.y, station.sweep_length)
+                new_contacts = new_contacts[~found]
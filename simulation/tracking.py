@@ -0,0 +1,184 @@
+import numpy as np
+from simulation.config import *
+
+MEASUREMENT = np.array([[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]])
+
+
+def gate_pairs(track_x : np.ndarray, track_y : np.ndarray, x : np.ndarray, y : np.ndarray, gate : float) -> 'tuple[np.ndarray, np.ndarray, np.ndarray]':
+    # tracks are hashed into a grid of gate-sized cells, each detection only looks at the 3x3 cells around it
+    if not len(track_x) or not len(x):
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, np.zeros(0)
+
+    stride = 1 << 32
+    track_cells = np.floor(track_x / gate).astype(np.int64) * stride + np.floor(track_y / gate).astype(np.int64)
+    order = np.argsort(track_cells, kind='stable')
+    sorted_cells = track_cells[order]
+    cell_x, cell_y = np.floor(x / gate).astype(np.int64), np.floor(y / gate).astype(np.int64)
+
+    detections, tracks = [], []
+    for offset_x in (-1, 0, 1):
+        for offset_y in (-1, 0, 1):
+            cells = (cell_x + offset_x) * stride + cell_y + offset_y
+            first = np.searchsorted(sorted_cells, cells, 'left')
+            counts = np.searchsorted(sorted_cells, cells, 'right') - first
+            repeated = np.repeat(np.arange(len(x)), counts)
+            within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            detections.append(repeated)
+            tracks.append(order[first[repeated] + within])
+
+    detections, tracks = np.concatenate(detections), np.concatenate(tracks)
+    distances = np.hypot(track_x[tracks] - x[detections], track_y[tracks] - y[detections])
+    gated = distances < gate
+    return detections[gated], tracks[gated], distances[gated]
+
+
+def nearest_neighbour(detections : np.ndarray, tracks : np.ndarray, distances : np.ndarray, detections_number : int,
+ tracks_number : int) -> 'tuple[np.ndarray, np.ndarray]':
+    # greedy global nearest neighbour: the closest remaining pair is always taken, conflicting pairs are resolved in rounds
+    order = np.argsort(distances, kind='stable')
+    detections, tracks = detections[order], tracks[order]
+    used_detections = np.zeros(detections_number, dtype=np.bool_)
+    used_tracks = np.zeros(tracks_number, dtype=np.bool_)
+    matched_detections, matched_tracks = [], []
+    while len(detections):
+        # pairs are sorted by distance, so the lowest pair position is the closest one;
+        # a pair closest for both its detection and its track is the one greedy matching would take
+        pairs = len(detections)
+        positions = np.arange(pairs)
+        best_track = np.full(detections_number, pairs)
+        np.minimum.at(best_track, detections, positions)
+        best_detection = np.full(tracks_number, pairs)
+        np.minimum.at(best_detection, tracks, positions)
+        chosen = np.flatnonzero((best_track[detections] == positions) & (best_detection[tracks] == positions))
+
+        matched_detections.append(detections[chosen])
+        matched_tracks.append(tracks[chosen])
+        used_detections[detections[chosen]] = True
+        used_tracks[tracks[chosen]] = True
+        free = ~used_detections[detections] & ~used_tracks[tracks]
+        detections, tracks = detections[free], tracks[free]
+
+    if not matched_detections:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    return np.concatenate(matched_detections), np.concatenate(matched_tracks)
+
+
+class ContactTracker:
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, gate : float = TRACK_GATE, lifetime : float = TRACK_LIFETIME_S * TICKS_PER_SECOND,
+     confirm_hits : int = TRACK_CONFIRM_HITS, process_noise : float = TRACK_PROCESS_NOISE,
+     measurement_noise : float = TRACK_MEASUREMENT_NOISE, initial_speed_variance : float = TRACK_INITIAL_SPEED_VARIANCE) -> None:
+        self.gate = gate
+        self.lifetime = lifetime
+        self.confirm_hits = confirm_hits
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.initial_speed_variance = initial_speed_variance
+        self.tick = 0
+        self.count = 0
+        self.__next_id = 0
+
+        self.state = np.zeros((self.INITIAL_CAPACITY, 4))
+        self.covariance = np.zeros((self.INITIAL_CAPACITY, 4, 4))
+        self.ids = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.hits = np.zeros(self.INITIAL_CAPACITY, dtype=np.int32)
+        self.last_seen = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+
+    @property
+    def confirmed(self) -> np.ndarray:
+        return self.hits[:self.count] >= self.confirm_hits
+
+    def update(self, tick : int, x : np.ndarray, y : np.ndarray) -> 'tuple[np.ndarray, np.ndarray]':
+        # returns the matched detections with the ids of their tracks
+        self.__predict(tick - self.tick)
+        self.tick = tick
+
+        n = self.count
+        detections, tracks = nearest_neighbour(*gate_pairs(self.state[:n, 0], self.state[:n, 1], x, y, self.gate), len(x), n)
+        self.__correct(tracks, np.column_stack([x[detections], y[detections]]))
+        track_ids = self.ids[tracks]
+
+        unmatched = np.ones(len(x), dtype=np.bool_)
+        unmatched[detections] = False
+        self.__drop(tick - self.last_seen[:n] > self.lifetime)
+        self.__start(x[unmatched], y[unmatched])
+        return detections, track_ids
+
+    def predicted_positions(self, tick : float = None) -> 'tuple[np.ndarray, np.ndarray]':
+        delta = 0.0 if tick is None else tick - self.tick
+        state = self.state[:self.count]
+        return state[:, 0] + delta * state[:, 2], state[:, 1] + delta * state[:, 3]
+
+    def velocities(self) -> 'tuple[np.ndarray, np.ndarray]':
+        return self.state[:self.count, 2], self.state[:self.count, 3]
+
+    def __predict(self, delta : float) -> None:
+        if delta <= 0 or not self.count:
+            return
+        n = self.count
+        transition = np.eye(4)
+        transition[0, 2] = transition[1, 3] = delta
+        # white acceleration noise of the constant velocity model
+        position, cross, speed = delta ** 3 / 3, delta ** 2 / 2, delta
+        noise = self.process_noise * np.array([
+            [position, 0, cross, 0],
+            [0, position, 0, cross],
+            [cross, 0, speed, 0],
+            [0, cross, 0, speed],
+        ])
+
+        self.state[:n] = self.state[:n] @ transition.T
+        self.covariance[:n] = transition @ self.covariance[:n] @ transition.T + noise
+
+    def __correct(self, tracks : np.ndarray, measurements : np.ndarray) -> None:
+        if not len(tracks):
+            return
+        state, covariance = self.state[tracks], self.covariance[tracks]
+        innovation = measurements - state[:, :2]
+        innovation_covariance = covariance[:, :2, :2] + self.measurement_noise * np.eye(2)
+        gain = covariance[:, :, :2] @ np.linalg.inv(innovation_covariance)
+
+        self.state[tracks] = state + (gain @ innovation[:, :, None])[:, :, 0]
+        self.covariance[tracks] = covariance - gain @ MEASUREMENT @ covariance
+        self.hits[tracks] += 1
+        self.last_seen[tracks] = self.tick
+
+    def __start(self, x : np.ndarray, y : np.ndarray) -> None:
+        number = len(x)
+        start, end = self.count, self.count + number
+        if end > len(self.ids):
+            self.__allocate(max(end, 2 * len(self.ids)))
+
+        self.state[start:end] = 0.0
+        self.state[start:end, 0] = x
+        self.state[start:end, 1] = y
+        self.covariance[start:end] = np.diag([self.measurement_noise, self.measurement_noise,
+         self.initial_speed_variance, self.initial_speed_variance])
+        self.ids[start:end] = np.arange(self.__next_id, self.__next_id + number)
+        self.__next_id += number
+        self.hits[start:end] = 1
+        self.last_seen[start:end] = self.tick
+        self.count = end
+
+    def __drop(self, expired : np.ndarray) -> None:
+        if not expired.any():
+            return
+        kept = np.flatnonzero(~expired)
+        self.count = len(kept)
+        for array in (self.state, self.covariance, self.ids, self.hits, self.last_seen):
+            array[:self.count] = array[kept]
+
+    def __allocate(self, capacity : int) -> None:
+        def grow(array):
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            return grown
+
+        self.state = grow(self.state)
+        self.covariance = grow(self.covariance)
+        self.ids = grow(self.ids)
+        self.hits = grow(self.hits)
+        self.last_seen = grow(self.last_seen)
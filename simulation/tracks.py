@@ -0,0 +1,39 @@
+from collections import deque
+from typing import Iterable
+from simulation.config import *
+
+
+class TrackTable:
+    def __init__(self, lifetime : float = RADAR_REFRESH_TIME * TICKS_PER_SECOND) -> None:
+        self.lifetime = lifetime
+        self.discovered_at : 'dict[int, float]' = {}
+        # timestamps come from one monotonic clock and every track shares the lifetime,
+        # so expiry order equals insertion order and a FIFO is enough
+        self.__expiry_queue : 'deque[tuple[float, int]]' = deque()
+
+    def __len__(self) -> int:
+        return len(self.discovered_at)
+
+    def __contains__(self, track_id : int) -> bool:
+        return track_id in self.discovered_at
+
+    def __iter__(self):
+        return iter(self.discovered_at)
+
+    def discover(self, track_id : int, timestamp : float) -> bool:
+        if track_id in self.discovered_at:
+            return False
+        self.discovered_at[track_id] = timestamp
+        self.__expiry_queue.append((timestamp + self.lifetime, track_id))
+        return True
+
+    def discover_many(self, track_ids : Iterable[int], timestamp : float) -> 'list[int]':
+        return [track_id for track_id in track_ids if self.discover(track_id, timestamp)]
+
+    def expire(self, timestamp : float) -> 'list[int]':
+        expired = []
+        while self.__expiry_queue and self.__expiry_queue[0][0] <= timestamp:
+            _, track_id = self.__expiry_queue.popleft()
+            del self.discovered_at[track_id]
+            expired.append(track_id)
+        return expired
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 
 @dataclass
 class Point2D:
+    __slots__ = ('x', 'y')
     x : float
     y : float
 
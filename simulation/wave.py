@@ -1,68 +1,50 @@
-import arcade
-import datetime
-import math
+import numpy as np
 from simulation.config import *
-from simulation.shapes import Shape
 
 
-class Wave:
-    def __init__(self, x : float, y : float, color : arcade.Color, maximum_radius : float = SWEEP_LENGTH,
-     init_radius : float = INIT_WAVE_RADIUS, initial_delay : datetime.timedelta = datetime.timedelta(seconds=0)) -> None:
-        self.x = x
-        self.y = y
-        self.color = color
-        self.maximum_radius = maximum_radius
+class WavePool:
+    def __init__(self, capacity : int = WAVE_POOL_CAPACITY, init_radius : float = INIT_WAVE_RADIUS, radius_delta : float = RADIUS_DELTA) -> None:
+        self.capacity = capacity
         self.init_radius = init_radius
-        self.initial_delay = initial_delay
-        self.radius = self.init_radius
-        self.radius_delta = RADIUS_DELTA
-        self.started_time = datetime.datetime.now()
-        self.started = False
-
-    def draw_wave(self) -> None:
-        if self.started:
-            arcade.draw_circle_outline(self.x, self.y, self.radius, color=self.color, border_width=1)
-
-    def update_radius(self) -> None:
-        if self.started:
-            if self.is_in_range():
-                self.radius += self.radius_delta
-            else:
-                self.radius = self.init_radius
-        else:
-            self.__hold_on_delay()
-
-    def is_in_range(self) -> bool:
-        return self.radius <= self.maximum_radius
-
-    def is_shape_in_wave(self, shape : Shape):
-        return (shape.x - CENTER_X) ** 2 + (shape.y - CENTER_Y) ** 2 - self.radius ** 2 < 0
-
-    def __hold_on_delay(self) -> None:
-        if datetime.datetime.now() - self.started_time > self.initial_delay:
-            self.started = True
-    
-
-class RadarWave(Wave):
-    def __init__(self, x: float, y: float, color: arcade.Color = arcade.color.GREEN, maximum_radius : float = SWEEP_LENGTH,
-     init_radius : float = INIT_WAVE_RADIUS, initial_delay : datetime.timedelta = datetime.timedelta(seconds=0)) -> None:
-        super().__init__(x, y, color, maximum_radius, init_radius, initial_delay)
-
-
-class ObjectWave(Wave):
-    def __init__(self, x: float, y: float, color: arcade.Color = arcade.color.BROWN, maximum_radius : float = SWEEP_LENGTH,
-     init_radius : float = INIT_WAVE_RADIUS, initial_delay : datetime.timedelta = datetime.timedelta(seconds=0)) -> None:
-        super().__init__(x, y, color, maximum_radius, init_radius, initial_delay)
-        self.active = True
-
-    def is_in_range(self) -> bool:
-        if self.radius + self.__get_distance_from_center() > self.maximum_radius:
-            self.active = False
-            return False
-        if self.radius + self.__get_distance_from_center() > self.maximum_radius:
-            self.active = False
-            return False
-        return True
-
-    def __get_distance_from_center(self):
-        return math.sqrt(abs(self.x - CENTER_X) ** 2 + abs(self.y - CENTER_Y) ** 2)
\ No newline at end of file
+        self.radius_delta = radius_delta
+        self.dropped = 0
+
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.radius = np.zeros(capacity, dtype=np.float64)
+        self.reach = np.zeros(capacity, dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=np.bool_)
+        # stack of free slots, the top is at free[free_count - 1]
+        self.free = np.arange(capacity - 1, -1, -1, dtype=np.intp)
+        self.free_count = capacity
+
+    def __len__(self) -> int:
+        return self.capacity - self.free_count
+
+    def spawn(self, x : np.ndarray, y : np.ndarray, center_x : float, center_y : float, maximum_radius : float) -> np.ndarray:
+        # a wave fades out once it leaves the circle of maximum_radius around the station that spawned it
+        number = min(len(x), self.free_count)
+        self.dropped += len(x) - number
+        slots = self.free[self.free_count - number:self.free_count].copy()
+        self.free_count -= number
+
+        self.x[slots] = x[:number]
+        self.y[slots] = y[:number]
+        self.radius[slots] = self.init_radius
+        # the distance to the station is constant for a wave, so the radius it can grow to is computed once on spawn
+        self.reach[slots] = maximum_radius - np.hypot(self.x[slots] - center_x, self.y[slots] - center_y)
+        self.active[slots] = True
+        return slots
+
+    def update(self) -> None:
+        expired = self.active & (self.radius > self.reach)
+        self.active &= ~expired
+        self.radius[self.active] += self.radius_delta
+
+        released = np.flatnonzero(expired)
+        self.free[self.free_count:self.free_count + len(released)] = released
+        self.free_count += len(released)
+
+    def circles(self) -> 'tuple[np.ndarray, np.ndarray, np.ndarray]':
+        active = self.active
+        return self.x[active], self.y[active], self.radius[active]
@@ -1,3 +1,4 @@
+import arcade
 from arcade.experimental.uislider import UISlider
 from arcade.gui import UIManager, UIAnchorWidget, UILabel, UIFlatButton
 from arcade.gui.events import UIOnChangeEvent, UIOnClickEvent
@@ -15,6 +16,7 @@ class RadarWidgetManager:
         self.__setup_minimap()
         self.__setup_generative_widgets()
         self.__setup_param_widgets()
+        self.__setup_profiler_widgets()
 
     def draw(self) -> None:
         self.manager.draw()
@@ -89,4 +91,13 @@ class RadarWidgetManager:
 
         self.manager.add(UIAnchorWidget(child=generate_button, align_y=-10, align_x=-10, anchor_x='right', anchor_y='top'))
         self.manager.add(UIAnchorWidget(child=ui_slider, align_y=-80, anchor_x='right', anchor_y='top'))
-        self.manager.add(UIAnchorWidget(child=label_slider, align_x=-20, align_y=-70, anchor_x='right', anchor_y='top'))
\ No newline at end of file
+        self.manager.add(UIAnchorWidget(child=label_slider, align_x=-20, align_y=-70, anchor_x='right', anchor_y='top'))
+
+    def __setup_profiler_widgets(self) -> None:
+        profiler_button = UIFlatButton(text="Profiler", width=100, style={'bg_color': arcade.color.DARK_SLATE_GRAY})
+
+        @profiler_button.event()
+        def on_click(event: UIOnClickEvent):
+            self.window.toggle_profiler_overlay()
+
+        self.manager.add(UIAnchorWidget(child=profiler_button, align_y=-260, align_x=20, anchor_x='left', anchor_y='top'))
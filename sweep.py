@@ -0,0 +1,34 @@
+import argparse
+from simulation import sweep
+from simulation.config import RADIANS_PER_FRAME, RADAR_RANGE, RADAR_REFRESH_TIME, WAVE_DELAY_S, OBJECTS_DEFAULT_SPEED, TICKS_PER_SECOND
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the headless simulation over a grid of radar parameters")
+    parser.add_argument('--speed', type=float, nargs='+', default=[RADIANS_PER_FRAME], help="radar speeds in radians per tick")
+    parser.add_argument('--range', type=float, nargs='+', default=[RADAR_RANGE], help="radar ranges in radians")
+    parser.add_argument('--refresh', type=float, nargs='+', default=[RADAR_REFRESH_TIME], help="contact refresh times in seconds")
+    parser.add_argument('--wave-delay', type=float, nargs='+', default=[WAVE_DELAY_S], help="delays between radar waves in seconds")
+    parser.add_argument('--objects-speed', type=int, nargs='+', default=[OBJECTS_DEFAULT_SPEED], help="maximum object speeds")
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0], help="seeds of the generated targets, metrics are averaged over them")
+    parser.add_argument('--targets', type=int, default=sweep.DEFAULT_TARGETS, help="number of targets in every run")
+    parser.add_argument('--duration', type=float, default=sweep.DEFAULT_DURATION_S, help="simulated seconds per run")
+    parser.add_argument('--processes', type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument('--cache', metavar='PATH', default='sweep_cache.jsonl', help="finished runs, reused when the sweep is resumed")
+    parser.add_argument('--output', metavar='PATH', default=None, help="write the aggregated table to a CSV file")
+    args = parser.parse_args()
+
+    configs = sweep.config_grid(args.speed, args.range, args.refresh, args.wave_delay, args.objects_speed, args.seeds,
+     args.targets, int(args.duration * TICKS_PER_SECOND))
+    rows = sweep.aggregate(sweep.run_sweep(configs, args.cache, args.processes, progress=True))
+
+    print(f"{'speed':>8} {'range':>6} {'refresh':>7} {'delay':>6} {'objects':>7} {'runs':>4}  {'detected':>8} "
+          f"{'first s':>8} {'missed':>7} {'undetected':>10} {'hits/s':>7} {'ticks/s':>9}")
+    for row in rows:
+        print(f"{row['speed']:8.3f} {row['radar_range']:6.2f} {row['refresh_time']:7.2f} {row['wave_delay']:6.2f} "
+              f"{row['objects_speed']:7d} {row['runs']:4d}  {row['detection_rate']:8.1%} {row['time_to_first_detect_s']:8.2f} "
+              f"{row['missed_contacts']:7.1f} {row['undetected_targets']:10.1f} {row['detections_per_target_s']:7.2f} "
+              f"{row['ticks_per_second']:9.0f}")
+
+    if args.output:
+        sweep.export_csv(rows, args.output)
@@ -0,0 +1,41 @@
+from simulation.clock import FixedTimestepScheduler, ManualClock
+
+
+def scheduler(time_scale : float = 1.0, max_ticks_per_frame : int = 5) -> 'tuple[FixedTimestepScheduler, ManualClock, list]':
+    clock = ManualClock()
+    ticks = []
+    return FixedTimestepScheduler(lambda: ticks.append(clock.now()), 10, clock, max_ticks_per_frame, time_scale), clock, ticks
+
+
+def test_advance_runs_whole_ticks_and_keeps_the_remainder():
+    fixed, clock, ticks = scheduler()
+    fixed.advance()
+    clock.advance(0.25)
+    assert fixed.advance() == 2
+    assert abs(fixed.alpha - 0.5) < 1e-9
+    clock.advance(0.06)
+    assert fixed.advance() == 1
+    assert fixed.ticks == len(ticks) == 3
+
+
+def test_time_scale_multiplies_the_ticks():
+    fixed, clock, _ = scheduler(time_scale=2.0)
+    fixed.advance()
+    clock.advance(0.2)
+    assert fixed.advance() == 4
+
+
+def test_backlog_is_dropped_after_the_tick_limit():
+    fixed, clock, _ = scheduler(max_ticks_per_frame=3)
+    fixed.advance()
+    clock.advance(10.0)
+    assert fixed.advance() == 3
+    assert fixed.alpha <= 1.0
+    assert fixed.advance() == 1
+
+
+def test_run_unthrottled_ignores_the_clock():
+    fixed, clock, ticks = scheduler()
+    fixed.run_unthrottled(50)
+    assert fixed.ticks == len(ticks) == 50
+    assert fixed.advance() == 0
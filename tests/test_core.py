@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from simulation.core import SimulationCore
+from simulation.events import DetectionEventKind
+from simulation.scenario import random_targets
+
+
+def shuffled_core(count : int = 300, seed : int = 0) -> SimulationCore:
+    core = SimulationCore(seed=seed)
+    core.add_targets(random_targets(count, seed, objects_speed=2))
+    order = np.random.default_rng(seed).permutation(count)
+    n = core.count
+    core.restore(core.tick, core.angle, core.radar_range, core.ids[:n][order], core.x[:n][order], core.y[:n][order],
+     core.shape_angle[:n][order], core.shape_width[:n][order], core.shape_height[:n][order], core.kind[:n][order], core.color[:n][order])
+    return core
+
+
+def test_rows_of_maps_ids_in_any_order():
+    core = shuffled_core()
+    ids = core.ids[:core.count]
+    rows = np.array([5, 0, 299, 17])
+    assert core.rows_of(ids[rows]).tolist() == rows.tolist()
+
+    core.add_targets(random_targets(3, 1))
+    assert core.rows_of(core.ids[[300, 2]]).tolist() == [300, 2]
+
+
+def test_event_positions_belong_to_their_shapes():
+    core = shuffled_core()
+    subscription = core.feed.subscribe(maxsize=100000)
+    kinds = set()
+    for _ in range(600):
+        core.step()
+        for event in subscription.drain():
+            kinds.add(event.kind)
+            (row,) = np.flatnonzero(core.ids[:core.count] == event.shape_id)
+            assert (event.x, event.y) == (core.x[row], core.y[row])
+    assert DetectionEventKind.LOST_CONTACT in kinds
+
+
+def test_stations_without_waves_are_rejected():
+    with pytest.raises(ValueError):
+        SimulationCore(waves_number=0)
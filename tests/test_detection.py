@@ -0,0 +1,72 @@
+import math
+import numpy as np
+from simulation.detection import sector_mask, stations_swept_mask, swept_sector_mask
+
+
+def polar(bearings, distances, center_x : float = 0.0, center_y : float = 0.0) -> 'tuple[np.ndarray, np.ndarray]':
+    # the sweep convention: 0 points up and the bearing grows clockwise
+    bearings, distances = np.asarray(bearings, dtype=np.float64), np.asarray(distances, dtype=np.float64)
+    return center_x + distances * np.sin(bearings), center_y + distances * np.cos(bearings)
+
+
+def test_sector_mask_covers_the_range_clockwise_from_the_angle():
+    x, y = polar([0.1, 0.9, 1.1, -0.1, 0.5, 0.5], [50, 50, 50, 50, 99, 101], 10, 20)
+    assert sector_mask(x, y, 10, 20, 0.0, 1.0, 100).tolist() == [True, True, False, False, True, False]
+
+
+def test_sector_mask_wraps_around_zero():
+    x, y = polar([2 * math.pi - 0.2, 0.2, math.pi], [50, 50, 50])
+    assert sector_mask(x, y, 0, 0, 2 * math.pi - 0.5, 1.0, 100).tolist() == [True, True, False]
+
+
+def test_sector_mask_wider_than_half_a_turn_and_full_circle():
+    x, y = polar([0.5, 3.0, 4.0, 5.5], [50, 50, 50, 50])
+    assert sector_mask(x, y, 0, 0, 0.0, 4.5, 100).tolist() == [True, True, True, False]
+    assert sector_mask(x, y, 0, 0, 0.0, 2 * math.pi, 100).all()
+
+
+def test_sector_mask_stops_at_the_wave_radius():
+    x, y = polar([0.5, 0.5], [30, 60])
+    assert sector_mask(x, y, 0, 0, 0.0, 1.0, 100, wave_radius=40).tolist() == [True, False]
+
+
+def test_swept_mask_of_standing_targets_covers_the_whole_sweep():
+    x, y = polar([0.05, 0.25, 0.45, 0.6], [50, 50, 50, 50])
+    # the beam of range 0.2 turned by 0.3 since the previous tick, so it covered bearings from 0 to 0.5
+    mask = swept_sector_mask(x, y, x, y, 0, 0, 0.0, 0.3, 0.2, 100)
+    assert mask.tolist() == [True, True, True, False]
+    assert not sector_mask(x[:1], y[:1], 0, 0, 0.3, 0.2, 100).any()
+
+
+def test_swept_mask_catches_targets_stepping_over_the_beam():
+    previous_x, previous_y = polar([-0.3, 0.0], [50, 150])
+    x, y = polar([0.3, 0.0], [50, 50])
+    # the beam covers bearings from -0.1 to 0.1, the first target jumps across it and the second one enters the range inside it
+    angle = 2 * math.pi - 0.1
+    mask = swept_sector_mask(previous_x, previous_y, x, y, 0, 0, angle, 0.0, 0.2, 100)
+    assert mask.tolist() == [True, True]
+    assert not sector_mask(previous_x[:1], previous_y[:1], 0, 0, angle, 0.2, 100).any()
+    assert not sector_mask(x[:1], y[:1], 0, 0, angle, 0.2, 100).any()
+
+
+def test_swept_mask_catches_segments_passing_through_the_range():
+    previous_x, previous_y = np.array([-150.0, -150.0]), np.array([50.0, 150.0])
+    x, y = np.array([150.0, 150.0]), np.array([50.0, 150.0])
+    mask = swept_sector_mask(previous_x, previous_y, x, y, 0, 0, 0.0, 0.0, 2 * math.pi, 100)
+    assert mask.tolist() == [True, False]
+
+
+def test_stations_mask_matches_each_station_on_its_own():
+    rng = np.random.default_rng(0)
+    previous_x, previous_y = rng.uniform(0, 800, 2000), rng.uniform(0, 600, 2000)
+    x, y = previous_x + rng.uniform(-6, 6, 2000), previous_y + rng.uniform(-6, 6, 2000)
+    centers_x, centers_y = np.array([100.0, 400.0, 700.0]), np.array([100.0, 300.0, 500.0])
+    angles, sweeps = np.array([0.0, 2.0, 5.0]), np.array([0.05, -0.1, 0.3])
+    ranges, limits = np.array([0.5, 1.0, 4.0]), np.array([150.0, 250.0, 120.0])
+
+    mask = stations_swept_mask(previous_x, previous_y, x, y, centers_x, centers_y, angles, sweeps, ranges, limits, chunk_size=256)
+    for station in range(3):
+        expected = swept_sector_mask(previous_x, previous_y, x, y, centers_x[station], centers_y[station], angles[station],
+         sweeps[station], ranges[station], limits[station])
+        np.testing.assert_array_equal(mask[station], expected)
+        assert expected.any()
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import pytest
+from simulation.events import DetectionEvent, DetectionEventKind, DetectionFeed, OverflowPolicy
+
+
+def events(count : int, start : int = 0) -> 'list[DetectionEvent]':
+    return [DetectionEvent(DetectionEventKind.NEW_CONTACT, i, float(i), 0.0, 0.0, i) for i in range(start, start + count)]
+
+
+def test_drop_oldest_keeps_the_newest_events_and_counts_the_rest():
+    feed = DetectionFeed()
+    subscription = feed.subscribe(maxsize=3)
+    feed.publish(events(5))
+    feed.publish(events(2, 5))
+    assert [event.shape_id for event in subscription.drain()] == [4, 5, 6]
+    assert subscription.dropped == 4
+
+
+def test_block_holds_the_publisher_until_the_consumer_catches_up():
+    feed = DetectionFeed()
+    subscription = feed.subscribe(maxsize=2, overflow=OverflowPolicy.BLOCK)
+    publisher = threading.Thread(target=feed.publish, args=(events(6),))
+    publisher.start()
+    publisher.join(0.2)
+    assert publisher.is_alive()
+
+    received = iter(subscription)
+    assert [next(received).shape_id for _ in range(6)] == list(range(6))
+    publisher.join(5)
+    assert not publisher.is_alive()
+    assert subscription.dropped == 0
+
+
+def test_closing_a_full_blocking_subscription_releases_the_publisher():
+    feed = DetectionFeed()
+    subscription = feed.subscribe(maxsize=1, overflow=OverflowPolicy.BLOCK)
+    publisher = threading.Thread(target=feed.publish, args=(events(3),))
+    publisher.start()
+    publisher.join(0.2)
+    assert publisher.is_alive()
+    subscription.close()
+    publisher.join(5)
+    assert not publisher.is_alive()
+    assert not feed.active
+    assert list(subscription) == events(1)
+
+
+def test_async_subscription_drops_the_oldest_events_in_the_loop_thread():
+    async def consume() -> 'tuple[list[int], int]':
+        feed = DetectionFeed()
+        subscription = feed.subscribe_async(maxsize=3)
+        feed.publish(events(5))
+        received = [(await subscription.get()).shape_id for _ in range(3)]
+        assert subscription.queue.empty()
+        return received, subscription.dropped
+
+    assert asyncio.run(consume()) == ([2, 3, 4], 2)
+
+
+def test_async_subscription_receives_events_published_from_another_thread():
+    async def consume(overflow : OverflowPolicy) -> 'list[int]':
+        feed = DetectionFeed()
+        subscription = feed.subscribe_async(maxsize=2, overflow=overflow)
+        publisher = threading.Thread(target=lambda: [feed.publish(events(1, i)) for i in range(6)])
+        publisher.start()
+        received = []
+        async for event in subscription:
+            received.append(event.shape_id)
+            if event.shape_id == 5:
+                break
+        await asyncio.get_running_loop().run_in_executor(None, publisher.join)
+        subscription.close()
+        assert not feed.active
+        return received
+
+    assert asyncio.run(consume(OverflowPolicy.BLOCK)) == list(range(6))
+    assert asyncio.run(consume(OverflowPolicy.DROP_OLDEST))[-1] == 5
+
+
+def test_async_block_refuses_to_publish_from_the_loop_thread():
+    async def publish() -> None:
+        feed = DetectionFeed()
+        feed.subscribe_async(maxsize=1, overflow=OverflowPolicy.BLOCK)
+        feed.publish(events(2))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(publish())
@@ -0,0 +1,57 @@
+import numpy as np
+from simulation.core import SimulationCore, move_shapes
+from simulation.scenario import random_targets
+from simulation.shapes import Ellipse, StableRectangle
+
+
+def test_shapes_move_by_their_velocity():
+    x, y, angle = np.array([10.0, 50.0]), np.array([20.0, 60.0]), np.array([0.0, 90.0])
+    delta_x, delta_y, delta_angle = np.array([2.0, -3.0]), np.array([1.0, 4.0]), np.array([1.0, -2.0])
+    move_shapes(x, y, angle, delta_x, delta_y, delta_angle, np.array([True, True]), 100, 100)
+    assert x.tolist() == [12.0, 47.0] and y.tolist() == [21.0, 64.0] and angle.tolist() == [1.0, 88.0]
+    assert delta_x.tolist() == [2.0, -3.0] and delta_y.tolist() == [1.0, 4.0]
+
+
+def test_shapes_bounce_off_the_walls():
+    # past the left, right, bottom and top wall, and the last one past the right wall but already heading back
+    x, y = np.array([1.0, 99.0, 50.0, 50.0, 102.0]), np.array([50.0, 50.0, 1.0, 99.0, 50.0])
+    delta_x, delta_y = np.array([-3.0, 3.0, 0.0, 0.0, -1.0]), np.array([0.0, 0.0, -3.0, 3.0, 0.0])
+    move_shapes(x, y, np.zeros(5), delta_x, delta_y, np.zeros(5), np.ones(5, dtype=np.bool_), 100, 100)
+    assert x.tolist() == [-2.0, 102.0, 50.0, 50.0, 101.0]
+    assert y.tolist() == [50.0, 50.0, -2.0, 102.0, 50.0]
+    # the velocity component towards the wall is reflected, the other one is kept
+    assert delta_x.tolist() == [3.0, -3.0, 0.0, 0.0, -1.0]
+    assert delta_y.tolist() == [0.0, 0.0, 3.0, -3.0, 0.0]
+
+    move_shapes(x, y, np.zeros(5), delta_x, delta_y, np.zeros(5), np.ones(5, dtype=np.bool_), 100, 100)
+    assert x.tolist() == [1.0, 99.0, 50.0, 50.0, 100.0]
+    assert y.tolist() == [50.0, 50.0, 1.0, 99.0, 50.0]
+
+
+def test_stable_rectangles_never_move():
+    core = SimulationCore(seed=3, objects_speed=4)
+    core.add_random_shapes(StableRectangle, 50)
+    core.add_random_shapes(Ellipse, 50)
+    core.add_targets(random_targets(50, 3, objects_speed=4, kinds=(StableRectangle,)))
+    stable = ~core.moving[:core.count]
+    assert stable.sum() == 100
+    x, y, angle = core.x[:core.count].copy(), core.y[:core.count].copy(), core.shape_angle[:core.count].copy()
+    for _ in range(200):
+        core.step()
+    np.testing.assert_array_equal(core.x[:core.count][stable], x[stable])
+    np.testing.assert_array_equal(core.y[:core.count][stable], y[stable])
+    np.testing.assert_array_equal(core.shape_angle[:core.count][stable], angle[stable])
+    assert (core.x[:core.count][~stable] != x[~stable]).any()
+
+
+def test_randomized_movement_stays_within_the_speed():
+    core = SimulationCore(seed=1)
+    core.add_random_shapes(Ellipse, 500)
+    core.randomize_movement(3)
+    n = core.count
+    assert core.delta_x[:n].min() >= -3 and core.delta_x[:n].max() <= 2
+    assert core.delta_y[:n].min() >= -3 and core.delta_y[:n].max() <= 2
+    assert core.delta_angle[:n].min() >= -3 and core.delta_angle[:n].max() <= 3
+    assert len(np.unique(core.delta_x[:n])) == 6
+    core.randomize_movement(0)
+    assert not core.delta_x[:n].any() and not core.delta_y[:n].any() and not core.delta_angle[:n].any()
@@ -0,0 +1,76 @@
+import csv
+import json
+import pytest
+from simulation.core import SimulationCore
+from simulation.profiling import NULL_STAGE, Profiler
+from simulation.scenario import random_targets
+from simulation.tick import RadarTick
+
+
+def profiled_frames(count : int) -> Profiler:
+    # frame i takes i milliseconds, most of it moving shapes
+    profiler = Profiler(enabled=True)
+    for i in range(1, count + 1):
+        profiler.record('move', 0, i * 800_000)
+        profiler.count('detections', 2)
+        profiler.end_frame()
+        profiler.frames[-1].duration = i * 1_000_000
+    return profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.stage('move') as stage:
+        pass
+    assert profiler.stage('detect') is NULL_STAGE and stage is None
+    profiler.count('detections', 5)
+    profiler.end_frame()
+    assert profiler.current is None and not profiler.frames
+    assert profiler.summary() == {}
+
+
+def test_summary_reports_the_mean_and_the_slow_tail():
+    profiler = profiled_frames(100)
+    summary = profiler.summary(frames=100)
+    assert summary['frame_ms'] == 50.5
+    assert summary['frame_p95_ms'] == 95.0
+    assert summary['frame_max_ms'] == 100.0
+    assert summary['move_ms'] == pytest.approx(40.4)
+    assert summary['detections'] == pytest.approx(2.0)
+
+    recent = profiler.summary(frames=10)
+    assert recent['frame_ms'] == 95.5 and recent['frame_p95_ms'] == recent['frame_max_ms'] == 100.0
+
+
+def test_stage_and_counter_names_do_not_overlap():
+    core = SimulationCore(seed=0)
+    core.add_targets(random_targets(100, 0))
+    core.profiler.enabled = True
+    tick = RadarTick(core)
+    for _ in range(30):
+        tick.step()
+        core.profiler.end_frame()
+    stages = {f"{name}_ms" for frame in core.profiler.frames for name in frame.stage_totals()}
+    counters = {name for frame in core.profiler.frames for name in frame.counters}
+    assert {'tracks_ms', 'tracking_ms'} <= stages and 'tracked_contacts' in counters
+    assert not {name[:-len('_ms')] for name in stages} & counters
+
+
+def test_export_writes_each_format(tmp_path):
+    profiler = profiled_frames(3)
+    profiler.export(str(tmp_path / 'frames.csv'))
+    profiler.export(str(tmp_path / 'frames.json'))
+    profiler.export(str(tmp_path / 'frames.trace.json'))
+
+    with open(tmp_path / 'frames.csv', newline='') as file:
+        rows = list(csv.DictReader(file))
+    assert [float(row['frame_ms']) for row in rows] == [1.0, 2.0, 3.0]
+    assert [int(row['detections']) for row in rows] == [2, 2, 2]
+
+    with open(tmp_path / 'frames.json') as file:
+        assert json.load(file) == profiler.time_series()
+
+    with open(tmp_path / 'frames.trace.json') as file:
+        events = json.load(file)['traceEvents']
+    assert [event['name'] for event in events] == ['frame', 'move', 'counters'] * 3
+    assert [event['dur'] for event in events if event['name'] == 'frame'] == [1000.0, 2000.0, 3000.0]
@@ -0,0 +1,90 @@
+import numpy as np
+from simulation.core import SimulationCore
+from simulation.recording import Recorder, Replay, ReplayPlayer
+from simulation.scenario import random_targets
+
+
+def record(path, ticks=30, targets=200):
+    core = SimulationCore(seed=3)
+    core.add_targets(random_targets(targets, 3, objects_speed=2))
+    states = []
+    with Recorder(str(path), core) as recorder:
+        for _ in range(ticks):
+            core.step()
+            recorder.record()
+            states.append((core.tick, core.x[:core.count].copy(), core.y[:core.count].copy(), core.ids[core.detected].copy()))
+    return states
+
+
+def test_replay_restores_recorded_ticks(tmp_path):
+    states = record(tmp_path / 'run.rec')
+    core = SimulationCore()
+    with Replay(str(tmp_path / 'run.rec')) as replay:
+        assert len(replay) == len(states)
+        player = ReplayPlayer(replay, core)
+        for tick, x, y, detected in states:
+            player.step()
+            assert core.tick == tick
+            np.testing.assert_allclose(core.x[:core.count], x, atol=1e-3)
+            np.testing.assert_allclose(core.y[:core.count], y, atol=1e-3)
+            assert sorted(core.ids[core.detected].tolist()) == sorted(detected.tolist())
+        assert player.finished
+
+
+def test_finished_replay_clears_detections_and_keeps_ticking(tmp_path):
+    record(tmp_path / 'run.rec', ticks=5)
+    core = SimulationCore()
+    with Replay(str(tmp_path / 'run.rec')) as replay:
+        player = ReplayPlayer(replay, core)
+        for _ in range(len(replay)):
+            player.step()
+        last_tick = core.tick
+        player.step()
+        player.step()
+        assert core.tick == last_tick + 2
+        assert len(core.detected) == 0
+        assert core.new_contacts == [] and core.lost_contacts == []
+
+
+def test_seek_in_empty_recording(tmp_path):
+    with Recorder(str(tmp_path / 'empty.rec'), SimulationCore()):
+        pass
+    with Replay(str(tmp_path / 'empty.rec')) as replay:
+        assert replay.position_of(10) == 0
+        player = ReplayPlayer(replay, SimulationCore())
+        player.seek(10)
+        assert player.finished
+
+
+def test_replay_of_a_recorder_that_was_never_closed(tmp_path):
+    path = tmp_path / 'crashed.rec'
+    core = SimulationCore(seed=3)
+    core.add_targets(random_targets(50, 3, objects_speed=2))
+    recorder = Recorder(str(path), core)
+    for _ in range(8):
+        core.step()
+        recorder.record()
+    recorder.file.flush()
+    # half of another frame made it to the disk before the session ended
+    complete = path.stat().st_size
+    core.step()
+    recorder.record()
+    recorder.file.flush()
+    with open(path, 'r+b') as file:
+        file.truncate(complete + 100)
+
+    with Replay(str(path)) as replay:
+        assert len(replay) == 8
+        assert replay.index['tick'].tolist() == list(range(1, 9))
+        assert len(replay.frame(7).shapes) == 50
+    recorder.file.close()
+
+
+def test_replay_closes_while_a_frame_is_still_used(tmp_path):
+    record(tmp_path / 'run.rec', ticks=3)
+    replay = Replay(str(tmp_path / 'run.rec'))
+    frame = replay.frame(1)
+    with replay:
+        shapes = frame.shapes
+    assert replay.file.closed
+    assert len(shapes) == 200 and shapes['id'].min() >= 0
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from simulation.scenario import SCENARIO_DTYPE, clustered_targets, load_scenario, random_targets, save_scenario
+from simulation.shapes import SHAPE_TYPES, Ellipse, StableRectangle
+
+
+@pytest.mark.parametrize('extension', ['csv', 'npy', 'parquet'])
+def test_scenario_round_trip(tmp_path, extension):
+    if extension == 'parquet':
+        pytest.importorskip('pyarrow')
+    targets = random_targets(50, 3, objects_speed=2, kinds=(Ellipse, StableRectangle))
+    path = str(tmp_path / f"scenario.{extension}")
+    save_scenario(path, targets)
+    loaded = load_scenario(path)
+    assert loaded.dtype == SCENARIO_DTYPE
+    for column in SCENARIO_DTYPE.names:
+        np.testing.assert_array_equal(loaded[column], targets[column])
+
+
+def test_csv_kinds_by_name_or_code_and_optional_columns(tmp_path):
+    path = tmp_path / "scenario.csv"
+    path.write_text("kind, x, y, width, height, g\nEllipse, 1.5, 2, 10, 20, 7\n 0, 3, 4, 5, 6, 8\n")
+    targets = load_scenario(str(path))
+    assert targets['kind'].tolist() == [SHAPE_TYPES.index(Ellipse), 0]
+    assert targets['x'].tolist() == [1.5, 3.0]
+    assert targets['color'].tolist() == [[255, 7, 255, 255], [255, 8, 255, 255]]
+    assert not targets['delta_x'].any()
+
+
+def test_csv_with_only_a_header_is_empty(tmp_path):
+    path = tmp_path / "scenario.csv"
+    path.write_text("kind,x,y,width,height\n")
+    assert len(load_scenario(str(path))) == 0
+
+
+@pytest.mark.parametrize('content, message', [
+    ("kind,x,y,width,height\nTriangle,1,2,3,4\n", "Unknown target kind"),
+    ("kind,x,y,width,height\n99,1,2,3,4\n", "kind codes"),
+    ("kind,x,y\nEllipse,1,2\n", "missing the width, height"),
+])
+def test_invalid_csv_scenarios(tmp_path, content, message):
+    path = tmp_path / "scenario.csv"
+    path.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        load_scenario(str(path))
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError, match="Unsupported scenario format"):
+        load_scenario("scenario.txt")
+
+
+def test_generated_targets_are_seeded_and_stay_on_the_map():
+    np.testing.assert_array_equal(random_targets(100, 5), random_targets(100, 5))
+    targets = clustered_targets(500, 4, seed=1, width=400, height=300)
+    assert targets['x'].min() >= 0 and targets['x'].max() <= 400
+    assert targets['y'].min() >= 0 and targets['y'].max() <= 300
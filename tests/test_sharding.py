@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from simulation.core import SimulationCore
+from simulation.scenario import random_targets
+from simulation.sharding import ShardedSimulation
+from simulation.station import RadarStation
+
+
+@pytest.mark.parametrize('stations', [[], [(150.0, 150.0), (650.0, 450.0)]])
+def test_sharded_simulation_matches_a_single_core(stations):
+    # fast targets cross the shard borders often, so shapes are handed over between workers many times
+    targets = random_targets(3000, 2, objects_speed=6)
+    reference = SimulationCore(seed=1)
+    reference.add_targets(targets)
+    with ShardedSimulation(capacity=4000, shards=3, seed=1) as sharded:
+        sharded.add_targets(targets)
+        for x, y in stations:
+            reference.add_station(RadarStation(x, y))
+            sharded.add_station(RadarStation(x, y))
+
+        for _ in range(120):
+            reference.step()
+            sharded.step()
+            n = reference.count
+            np.testing.assert_array_equal(sharded.x[:n], reference.x[:n])
+            np.testing.assert_array_equal(sharded.y[:n], reference.y[:n])
+            assert sharded.ids[sharded.detected].tolist() == reference.ids[reference.detected].tolist()
+        assert len(reference.tracks) > 0
+        workers = sharded.workers
+
+    # the workers are joined and the state stays readable after the shared memory is released
+    assert not any(worker.is_alive() for worker in workers)
+    np.testing.assert_array_equal(sharded.x[:n], reference.x[:n])
+
+
+def test_sharded_simulation_rejects_restore_and_overflow():
+    with ShardedSimulation(capacity=10, shards=2, seed=0) as sharded:
+        with pytest.raises(ValueError, match="full"):
+            sharded.add_targets(random_targets(11, 0))
+        sharded.add_targets(random_targets(10, 0))
+        with pytest.raises(NotImplementedError):
+            sharded.restore(1, 0.0, 1.0, sharded.ids[:10], sharded.x[:10], sharded.y[:10], sharded.shape_angle[:10],
+             sharded.shape_width[:10], sharded.shape_height[:10], sharded.kind[:10], sharded.color[:10])
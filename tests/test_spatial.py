@@ -0,0 +1,69 @@
+import math
+import numpy as np
+import pytest
+from simulation.core import SimulationCore
+from simulation.detection import swept_sector_mask
+from simulation.scenario import random_targets
+from simulation.spatial import AngularIndex
+
+
+def test_buckets_follow_the_sweep_convention():
+    index = AngularIndex(0, 0, max_radius=100, buckets_number=4, near_radius=10)
+    # 0 points up and the bearing grows clockwise
+    buckets = index.bucket_indices(np.array([1.0, 50.0, -1.0, -50.0, 0.0, 200.0]), np.array([50.0, -1.0, -50.0, 1.0, 5.0, 0.0]))
+    assert buckets.tolist() == [0, 1, 2, 3, index.center_bucket, AngularIndex.OUTSIDE]
+
+
+def test_margin_keeps_shapes_beyond_the_rim():
+    index = AngularIndex(0, 0, max_radius=100)
+    index.reserve(1)
+    index.update(np.array([0.0]), np.array([103.0]))
+    assert len(index) == 0
+    index.update(np.array([0.0]), np.array([103.0]), margin=5.0)
+    assert index.query(-0.1, 0.2).tolist() == [0]
+
+
+def test_update_moves_shapes_between_buckets():
+    index = AngularIndex(0, 0, max_radius=100, buckets_number=4, near_radius=10)
+    index.reserve(2)
+    index.update(np.array([50.0, -50.0]), np.array([-20.0, 20.0]))
+    assert index.query(math.pi / 2, 0.1).tolist() == [0]
+    index.update(np.array([-50.0, -50.0]), np.array([20.0, 20.0]))
+    assert index.query(math.pi / 2, 0.1).tolist() == []
+    assert index.query(3 * math.pi / 2, 0.1).tolist() == [0, 1]
+    index.truncate(1)
+    assert index.query(3 * math.pi / 2, 0.1).tolist() == [0]
+
+
+def test_update_of_given_rows_keeps_the_other_buckets():
+    index = AngularIndex(0, 0, max_radius=100, buckets_number=4, near_radius=10)
+    index.reserve(2)
+    index.update(np.array([50.0, -50.0]), np.array([-20.0, 20.0]))
+    # the second shape is not among the updated rows, so its stale position is ignored
+    index.update(np.array([-50.0, 50.0]), np.array([20.0, -20.0]), rows=np.array([0]))
+    assert index.bucket_of[:2].tolist() == [3, 3]
+
+
+def test_bearing_margin_bounds_the_bearing_change():
+    index = AngularIndex(0, 0, near_radius=50)
+    rng = np.random.default_rng(0)
+    step = 7.0
+    end = rng.uniform(-200, 200, (10000, 2))
+    end = end[np.hypot(end[:, 0], end[:, 1]) > index.near_radius]
+    direction = rng.uniform(0, 2 * math.pi, len(end))
+    start = end + step * np.column_stack([np.sin(direction), np.cos(direction)])
+    change = np.abs((np.arctan2(end[:, 0], end[:, 1]) - np.arctan2(start[:, 0], start[:, 1]) + math.pi) % (2 * math.pi) - math.pi)
+    assert change.max() <= index.bearing_margin(step)
+    assert index.bearing_margin(index.near_radius) == math.pi
+
+
+@pytest.mark.parametrize('objects_speed', [0, 1, 3, 5, 8])
+def test_indexed_detection_matches_a_full_scan(objects_speed):
+    core = SimulationCore(seed=1)
+    core.add_targets(random_targets(1200, 1, objects_speed=objects_speed))
+    for _ in range(600):
+        core.step()
+        n, station = core.count, core.station
+        full = swept_sector_mask(core.previous_x[:n], core.previous_y[:n], core.x[:n], core.y[:n], station.x, station.y,
+         station.previous_angle, station.speed, station.radar_range, station.sweep_length, station.wave_radii.max())
+        assert core.detected.tolist() == np.flatnonzero(full).tolist()
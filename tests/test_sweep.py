@@ -0,0 +1,57 @@
+import json
+from dataclasses import asdict, replace
+from simulation.sweep import aggregate, config_grid, load_cache, run_config, run_sweep
+
+
+def small_grid() -> list:
+    return config_grid([0.05], [0.3], [0.5], [0.1], [2], [0, 1], targets=40, ticks=180)
+
+
+def comparable(metrics) -> dict:
+    # the throughput depends on the machine, everything else on the config alone
+    return {**asdict(metrics), 'ticks_per_second': None}
+
+
+def test_run_config_is_deterministic():
+    config = small_grid()[0]
+    first, second = run_config(config)[1], run_config(config)[1]
+    assert comparable(first) == comparable(second)
+    assert 0.0 < first.detection_rate <= 1.0
+    assert first.undetected_targets <= config.targets
+
+
+def test_grid_values_are_normalized_before_hashing():
+    (config,) = config_grid([1], [1], [1], [1], [1.0], [0])
+    assert config.key == replace(config, speed=1.0, objects_speed=1).key
+
+
+def test_sweep_reuses_its_cache_and_reruns_a_cut_last_line(tmp_path):
+    path = str(tmp_path / 'sweep.jsonl')
+    configs = small_grid()
+    results = run_sweep(configs, path, processes=1)
+    with open(path) as file:
+        lines = file.readlines()
+    assert len(lines) == 2 and len(load_cache(path)) == 2
+
+    assert run_sweep(configs, path, processes=1) == results
+    with open(path) as file:
+        assert file.readlines() == lines
+
+    # an interrupted sweep leaves half of its last line behind
+    with open(path, 'w') as file:
+        file.write(lines[0] + lines[1][:len(lines[1]) // 2])
+    cut = json.loads(lines[1])['key']
+    assert list(load_cache(path)) == [json.loads(lines[0])['key']]
+
+    rerun = dict((config.key, metrics) for config, metrics in run_sweep(configs, path, processes=1))
+    assert comparable(rerun[cut]) == comparable(dict((config.key, metrics) for config, metrics in results)[cut])
+    assert set(load_cache(path)) == {config.key for config in configs}
+
+
+def test_aggregate_averages_the_seeds():
+    results = [run_config(config) for config in small_grid()]
+    (row,) = aggregate(results)
+    assert row['runs'] == 2
+    assert row['refresh_time'] == 0.5 and row['targets'] == 40
+    assert row['detection_rate'] == sum(metrics.detection_rate for _, metrics in results) / 2
+    assert row['missed_contacts'] == sum(metrics.missed_contacts for _, metrics in results) / 2
@@ -0,0 +1,106 @@
+import socket
+import time
+import numpy as np
+import pytest
+from simulation.core import SimulationCore
+from simulation.scenario import random_targets
+from simulation.telemetry import (DELTA, FRAME_HEADER, KEYFRAME, STATION_DTYPE, Snapshot, TelemetryDecoder, TelemetryServer, encode_snapshot,
+ quantize)
+
+
+def snapshot(sequence : int, ids, x, y, detected = ()) -> Snapshot:
+    stations = np.zeros(1, dtype=STATION_DTYPE)
+    stations['angle'] = sequence / 10
+    return Snapshot(sequence, 10 * sequence, stations, np.array(ids, dtype=np.uint32), quantize(np.array(x, dtype=np.float64)),
+     quantize(np.array(y, dtype=np.float64)), np.array(detected, dtype=np.uint32))
+
+
+def payload(frame : bytes) -> bytes:
+    (length,) = FRAME_HEADER.unpack_from(frame)
+    assert len(frame) == FRAME_HEADER.size + length
+    return frame[FRAME_HEADER.size:]
+
+
+def assert_decoded(decoder : TelemetryDecoder, expected : Snapshot) -> None:
+    order = np.argsort(decoder.ids)
+    assert decoder.ids[order].tolist() == sorted(expected.ids.tolist())
+    expected_order = np.argsort(expected.ids)
+    np.testing.assert_array_equal(decoder.x[order], expected.x[expected_order])
+    np.testing.assert_array_equal(decoder.y[order], expected.y[expected_order])
+    assert decoder.tick == expected.tick
+    np.testing.assert_array_equal(decoder.stations, expected.stations)
+
+
+def test_keyframe_and_deltas_rebuild_the_snapshots():
+    first = snapshot(1, [1, 2, 3, 4], [10.0, 20.0, 30.0, 40.0], [1.0, 2.0, 3.0, 4.0], [2])
+    # 1 is removed, 2 stands still, 3 and 4 move and 7 is added
+    second = snapshot(2, [2, 3, 4, 7], [20.0, 30.5, 39.25, 5.0], [2.0, 2.0, 4.0, 6.0], [3, 7])
+    third = snapshot(3, [3, 4, 7, 8], [31.0, 39.25, 6.0, 1.0], [2.0, 4.5, 6.0, 1.0])
+    decoder = TelemetryDecoder()
+
+    frame = decoder.apply(payload(encode_snapshot(first)))
+    assert frame['kind'] == KEYFRAME
+    assert_decoded(decoder, first)
+    assert decoder.detected.tolist() == [2]
+
+    frame = decoder.apply(payload(encode_snapshot(second, first)))
+    assert frame['kind'] == DELTA and frame['removed'].tolist() == [1]
+    assert frame['added'][0].tolist() == [7]
+    # only shapes that changed their position are sent
+    assert sorted(frame['moved'][0].tolist()) == [3, 4]
+    assert_decoded(decoder, second)
+    assert decoder.detected.tolist() == [3, 7]
+
+    decoder.apply(payload(encode_snapshot(third, second)))
+    assert_decoded(decoder, third)
+    positions_x, positions_y = decoder.positions
+    assert sorted(positions_x.tolist()) == [1.0, 6.0, 31.0, 39.25]
+
+
+def test_merged_detections_replace_the_snapshot_ones():
+    first = snapshot(1, [1], [0.0], [0.0], [1])
+    decoder = TelemetryDecoder()
+    decoder.apply(payload(encode_snapshot(first, detected=np.array([1, 5]))))
+    assert decoder.detected.tolist() == [1, 5]
+
+
+def test_long_jumps_fall_back_to_a_keyframe():
+    first = snapshot(1, [1, 2], [0.0, 0.0], [0.0, 0.0])
+    second = snapshot(2, [1, 2], [5000.0, 1.0], [0.0, 0.0])
+    decoder = TelemetryDecoder()
+    decoder.apply(payload(encode_snapshot(first)))
+    frame = decoder.apply(payload(encode_snapshot(second, first)))
+    assert frame['kind'] == KEYFRAME
+    assert_decoded(decoder, second)
+
+
+def test_delta_against_another_base_is_rejected():
+    first = snapshot(1, [1], [0.0], [0.0])
+    second = snapshot(2, [1], [1.0], [0.0])
+    third = snapshot(3, [1], [2.0], [0.0])
+    decoder = TelemetryDecoder()
+    decoder.apply(payload(encode_snapshot(first)))
+    with pytest.raises(ValueError, match="cannot be applied"):
+        decoder.apply(payload(encode_snapshot(third, second)))
+
+
+def test_server_streams_the_core_to_a_client():
+    core = SimulationCore(seed=0)
+    core.add_targets(random_targets(100, 0, objects_speed=2))
+    decoder = TelemetryDecoder()
+    with TelemetryServer(core, port=0, rate=1000) as server, socket.create_connection((server.host, server.port), timeout=5) as client:
+        deadline = time.monotonic() + 5
+        while not server.clients and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stream = client.makefile('rb')
+        for _ in range(3):
+            core.step()
+            time.sleep(0.002)
+            server.publish()
+            (length,) = FRAME_HEADER.unpack(stream.read(FRAME_HEADER.size))
+            decoder.apply(stream.read(length))
+
+    assert decoder.tick == core.tick
+    order = np.argsort(decoder.ids)
+    np.testing.assert_array_equal(decoder.ids[order], core.ids[:core.count])
+    np.testing.assert_allclose(decoder.positions[0][order], core.x[:core.count], atol=1 / 16)
@@ -0,0 +1,17 @@
+import numpy as np
+from simulation.core import SimulationCore
+from simulation.scenario import random_targets
+from simulation.tick import RadarTick
+
+
+def test_discoveries_expire_with_the_core_tracks():
+    core = SimulationCore(seed=3, refresh_time=0.5)
+    core.add_targets(random_targets(300, 3, objects_speed=2))
+    tick = RadarTick(core)
+    rediscovered = False
+    for _ in range(900):
+        tick.step()
+        ids = np.concatenate([element.ids for element in tick.radar_discovered_objects] or [np.empty(0, dtype=np.int64)])
+        assert len(ids) == len(np.unique(ids)) == len(core.tracks)
+        rediscovered |= any(element.radar_time_stamp > core.tracks.lifetime for element in tick.radar_discovered_objects)
+    assert rediscovered
@@ -0,0 +1,59 @@
+import numpy as np
+from simulation.tracking import ContactTracker, gate_pairs, nearest_neighbour
+
+
+def test_gate_pairs_find_every_pair_within_the_gate():
+    rng = np.random.default_rng(0)
+    track_x, track_y = rng.uniform(0, 200, 300), rng.uniform(0, 200, 300)
+    x, y = rng.uniform(0, 200, 200), rng.uniform(0, 200, 200)
+    detections, tracks, distances = gate_pairs(track_x, track_y, x, y, 12.0)
+
+    all_distances = np.hypot(track_x[None, :] - x[:, None], track_y[None, :] - y[:, None])
+    expected = set(zip(*np.nonzero(all_distances < 12.0)))
+    assert set(zip(detections.tolist(), tracks.tolist())) == {(int(d), int(t)) for d, t in expected}
+    np.testing.assert_allclose(distances, all_distances[detections, tracks])
+
+
+def test_gate_pairs_without_tracks_or_detections():
+    empty = np.zeros(0)
+    assert all(len(part) == 0 for part in gate_pairs(empty, empty, np.ones(3), np.ones(3), 5.0))
+    assert all(len(part) == 0 for part in gate_pairs(np.ones(3), np.ones(3), empty, empty, 5.0))
+
+
+def test_nearest_neighbour_takes_the_closest_pairs_first():
+    # detection 0 is closest to track 0, so detection 1 has to settle for track 1 although track 0 is closer to it too
+    detections, tracks, distances = np.array([0, 1, 1, 2]), np.array([0, 0, 1, 1]), np.array([1.0, 2.0, 3.0, 4.0])
+    matched_detections, matched_tracks = nearest_neighbour(detections, tracks, distances, 3, 2)
+    assert sorted(zip(matched_detections.tolist(), matched_tracks.tolist())) == [(0, 0), (1, 1)]
+
+
+def test_tracker_follows_targets_with_constant_velocity():
+    tracker = ContactTracker(gate=20.0, confirm_hits=3)
+    velocities = np.array([[2.0, 1.0], [-1.5, 0.5]])
+    start = np.array([[100.0, 100.0], [300.0, 200.0]])
+    ids = None
+    for tick in range(0, 60, 3):
+        position = start + tick * velocities
+        detections, track_ids = tracker.update(tick, position[:, 0], position[:, 1])
+        if tick:
+            order = np.argsort(detections)
+            assert detections[order].tolist() == [0, 1]
+            track_ids = track_ids[order]
+            ids = track_ids if ids is None else ids
+            # every target keeps its track
+            assert track_ids.tolist() == ids.tolist()
+
+    assert tracker.count == 2 and tracker.confirmed.all()
+    velocity_x, velocity_y = tracker.velocities()
+    np.testing.assert_allclose(np.column_stack([velocity_x, velocity_y]), velocities, atol=0.05)
+    predicted_x, predicted_y = tracker.predicted_positions(60)
+    np.testing.assert_allclose(np.column_stack([predicted_x, predicted_y]), start + 60 * velocities, atol=1.0)
+
+
+def test_tracks_without_detections_are_dropped():
+    tracker = ContactTracker(lifetime=10)
+    tracker.update(0, np.array([50.0]), np.array([50.0]))
+    tracker.update(5, np.zeros(0), np.zeros(0))
+    assert tracker.count == 1
+    tracker.update(11, np.zeros(0), np.zeros(0))
+    assert tracker.count == 0
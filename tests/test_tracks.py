@@ -0,0 +1,23 @@
+from simulation.tracks import TrackTable
+
+
+def test_tracks_are_discovered_once_and_expire_after_their_lifetime():
+    tracks = TrackTable(lifetime=10)
+    assert tracks.discover(7, 0)
+    assert not tracks.discover(7, 3)
+    assert tracks.discover_many([7, 8, 9], 5) == [8, 9]
+    assert len(tracks) == 3 and 8 in tracks and sorted(tracks) == [7, 8, 9]
+
+    assert tracks.expire(9) == []
+    assert tracks.expire(10) == [7]
+    assert tracks.expire(20) == [8, 9]
+    assert len(tracks) == 0 and 7 not in tracks
+
+
+def test_expired_tracks_can_be_discovered_again():
+    tracks = TrackTable(lifetime=2)
+    tracks.discover(1, 0)
+    assert tracks.expire(2) == [1]
+    assert tracks.discover(1, 3)
+    assert tracks.expire(4) == []
+    assert tracks.expire(5) == [1]
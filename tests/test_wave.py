@@ -0,0 +1,34 @@
+import numpy as np
+from simulation.wave import WavePool
+
+
+def test_waves_expire_at_the_range_of_their_own_station():
+    waves = WavePool(4, init_radius=0, radius_delta=10)
+    (far,) = waves.spawn(np.array([100.0]), np.array([0.0]), 0.0, 0.0, 150.0)
+    (near,) = waves.spawn(np.array([100.0]), np.array([0.0]), 100.0, 0.0, 150.0)
+    active = []
+    for _ in range(30):
+        waves.update()
+        active.append(waves.active.copy())
+    # 50 px are left to the rim of the first station and 150 px to the rim of the second one, at 10 px per tick
+    assert np.array(active)[:, far].sum() == 6
+    assert np.array(active)[:, near].sum() == 16
+    assert len(waves) == 0
+
+
+def test_expired_slots_are_reused_and_overflow_is_dropped():
+    waves = WavePool(3, init_radius=0, radius_delta=10)
+    slots = waves.spawn(np.zeros(5), np.zeros(5), 0.0, 0.0, 5.0)
+    assert len(slots) == 3 and len(waves) == 3 and waves.dropped == 2
+    waves.update()
+    waves.update()
+    assert len(waves) == 0
+    assert sorted(waves.spawn(np.zeros(3), np.zeros(3), 0.0, 0.0, 5.0).tolist()) == sorted(slots.tolist())
+
+
+def test_circles_return_only_active_waves():
+    waves = WavePool(4, init_radius=1, radius_delta=1)
+    waves.spawn(np.array([1.0, 2.0]), np.array([3.0, 4.0]), 0.0, 0.0, 100.0)
+    x, y, radius = waves.circles()
+    assert sorted(x.tolist()) == [1.0, 2.0] and sorted(y.tolist()) == [3.0, 4.0]
+    assert radius.tolist() == [1.0, 1.0]